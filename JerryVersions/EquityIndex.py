@@ -0,0 +1,357 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from texasholdem import Card
+from texasholdem.evaluator import evaluate
+from texasholdem.evaluator.lookup_table import LOOKUP_TABLE
+from JerryVersions.JerryHelpers import int_to_card, simulate_win_prob
+from numpy import ndarray, array, asarray, empty, full, quantile, \
+  searchsorted, sqrt, load, savez_compressed, mean, nan, abs as np_abs
+from random import Random
+from time import perf_counter
+from typing import Optional, Sequence
+import argparse
+
+######################## POSTFLOP EQUITY INDEX HELPERS #########################
+
+# lower rank bound of each evaluator rank class (1 is straight flush, 9 is
+# high card), derived from the evaluator's lookup table
+_CLASS_MAX_RANKS = sorted(LOOKUP_TABLE.MAX_TO_RANK_CLASS.keys())
+_CLASS_MIN_RANKS = [1] + [rank + 1 for rank in _CLASS_MAX_RANKS[:-1]]
+
+# the ten 5-rank windows that make a straight, as rank bitmasks (ace low first)
+_STRAIGHT_MASKS = [0b1000000001111] + \
+  [0b11111 << low for low in range(9)]
+
+# mixed radices of the fine abstraction key: street, number of opponents,
+# rank class, position within rank class, hole cards pairing the board,
+# pocket pair, overcards, flush cards, board suitedness, straight outs,
+# board paired
+_FINE_RADICES = (2, 10, 9, 8, 3, 2, 3, 5, 4, 3, 2)
+# mixed radices of the coarse abstraction key, a subset of the fine key used
+# when a fine key was seen too few times while building: street, number of
+# opponents, rank class, position within rank class, flush cards,
+# straight outs
+_COARSE_FIELDS = (0, 1, 2, 3, 7, 9)
+_COARSE_RADICES = tuple(_FINE_RADICES[i] for i in _COARSE_FIELDS)
+
+# helper to pack a tuple of small ints into a single int (mixed radix)
+def _pack(values:Sequence[int], radices:Sequence[int]):
+  key = 0
+  for value, radix in zip(values, radices):
+    key = key * radix + value
+  return key
+
+# helper to get the abstract board-texture features of (hole cards, board)
+# against `num_ops` opponents. every feature is invariant under suit
+# relabelling, so suit-isomorphic situations always share a key. see
+# _FINE_RADICES for the meaning of each entry.
+def board_features(hole:Sequence[Card], board:Sequence[Card], num_ops:int):
+  #
+  ########## MADE HAND ##########
+  hand_rank = evaluate(list(hole), list(board))
+  rank_class = 0
+  while (hand_rank > _CLASS_MAX_RANKS[rank_class]):
+    rank_class += 1
+  class_min = _CLASS_MIN_RANKS[rank_class]
+  class_size = _CLASS_MAX_RANKS[rank_class] - class_min + 1
+  class_pos = (hand_rank - class_min) * 8 // class_size
+  #
+  ########## HOLE CARDS RELATIVE TO BOARD ##########
+  board_ranks = [card.rank for card in board]
+  hole_match = sum(1 for card in hole if card.rank in board_ranks)
+  pocket_pair = int(hole[0].rank == hole[1].rank)
+  overcards = sum(1 for card in hole if card.rank > max(board_ranks))
+  #
+  ########## FLUSH TEXTURE ##########
+  all_cards = list(hole) + list(board)
+  flush_cards = max(sum(1 for card in all_cards if card.suit == suit)
+                    for suit in {card.suit for card in hole})
+  board_suited = max(sum(1 for card in board if card.suit == suit)
+                     for suit in {card.suit for card in board})
+  #
+  ########## STRAIGHT TEXTURE ##########
+  rank_mask = 0
+  for card in all_cards:
+    rank_mask |= 1 << card.rank
+  straight_outs = 0
+  for rank in range(13):
+    if (rank_mask & (1 << rank)):
+      continue
+    with_rank = rank_mask | (1 << rank)
+    for window in _STRAIGHT_MASKS:
+      if (with_rank & window == window and rank_mask & window != window):
+        straight_outs += 1
+        break
+  #
+  ########## BOARD PAIRING ##########
+  board_paired = int(len(set(board_ranks)) < len(board_ranks))
+  return (len(board) - 3, min(num_ops, 9), rank_class, class_pos, hole_match,
+          pocket_pair, overcards, min(flush_cards, 5) - 1,
+          board_suited - 1, min(straight_outs, 2), board_paired)
+
+########################## EQUITY INDEX CLASS DEFINITION #######################
+
+# class EquityIndex
+# an offline-built index mapping (hole cards, board) on the flop and turn to
+# equity buckets. situations are first abstracted into suit-invariant
+# board-texture features (see board_features()), each feature combination
+# seen while building is assigned a bucket of the street's equity
+# distribution, and lookups return the bucket's representative equity.
+# stored on disk as a compressed .npz of sorted keys and one byte per key,
+# along with the opponent counts it was built for and its validation error.
+# the abstraction is coarse: seeded builds measured a mean absolute error
+# around 0.13 (RMSE around 0.18) against high-bootstrap simulation, where
+# 200-bootstrap live simulation's RMSE is around 0.03. that's larger than
+# typical trained b1/b2 values, so JerryBotRational refuses indices whose
+# recorded error exceeds its max_index_error (see the build report).
+class EquityIndex:
+  def __init__(self, fine_keys:ndarray, fine_buckets:ndarray,
+               fine_counts:ndarray, coarse_keys:ndarray,
+               coarse_buckets:ndarray, centers:ndarray, min_count:int = 3,
+               num_opponents:Sequence[int] = tuple(range(1, 10)),
+               error:float = nan):
+    self.fine_keys = fine_keys        # sorted fine abstraction keys
+    self.fine_buckets = fine_buckets  # bucket of each fine key
+    self.fine_counts = fine_counts    # times each fine key was sampled
+    self.coarse_keys = coarse_keys    # sorted coarse abstraction keys
+    self.coarse_buckets = coarse_buckets  # bucket of each coarse key
+    self.centers = centers  # (street, bucket) representative equities
+    self.min_count = min_count  # fine keys sampled fewer times are skipped
+    # opponent counts the index was built for, lookups for others miss
+    self.num_opponents = tuple(int(n) for n in num_opponents)
+    self.error = float(error) # validation RMSE against reference equities
+
+  # save the index to `path` as a compressed .npz file
+  def save(self, path:str):
+    savez_compressed(path, fine_keys = self.fine_keys,
+                     fine_buckets = self.fine_buckets,
+                     fine_counts = self.fine_counts,
+                     coarse_keys = self.coarse_keys,
+                     coarse_buckets = self.coarse_buckets,
+                     centers = self.centers,
+                     min_count = array(self.min_count),
+                     num_opponents = array(self.num_opponents),
+                     error = array(self.error))
+    return None
+
+  # load an index previously written by save()
+  @staticmethod
+  def load(path:str):
+    with load(path) as data:
+      return EquityIndex(data["fine_keys"], data["fine_buckets"],
+                         data["fine_counts"], data["coarse_keys"],
+                         data["coarse_buckets"], data["centers"],
+                         int(data["min_count"]), data["num_opponents"],
+                         float(data["error"]))
+
+  # whether the index was built for `num_ops` opponents
+  def covers(self, num_ops:int):
+    return min(num_ops, 9) in self.num_opponents
+
+  # return the indexed probability of winning at showdown holding `hole` with
+  # community cards `board` against `num_ops` opponents, or None if the
+  # situation isn't covered (preflop, river, an opponent count it wasn't built
+  # for, or never seen while building)
+  def lookup(self, hole:Sequence[Card], board:Sequence[Card], num_ops:int):
+    # only the flop and turn are indexed
+    if (len(board) not in (3, 4) or not self.covers(num_ops)):
+      return None
+    features = board_features(hole, board, num_ops)
+    street = features[0]
+    # try the fine key first, if it was sampled often enough to be trusted
+    bucket = self._find(self.fine_keys, self.fine_buckets,
+                        _pack(features, _FINE_RADICES), self.fine_counts)
+    if (bucket is None):
+      # back off to the coarse key
+      bucket = self._find(self.coarse_keys, self.coarse_buckets,
+                          _pack([features[i] for i in _COARSE_FIELDS],
+                                _COARSE_RADICES))
+    if (bucket is None):
+      return None
+    return float(self.centers[street, bucket])
+
+  # helper to binary search `keys` for `key`, returning its bucket or None
+  def _find(self, keys:ndarray, buckets:ndarray, key:int,
+            counts:Optional[ndarray] = None):
+    i = int(searchsorted(keys, key))
+    if (i == keys.shape[0] or keys[i] != key):
+      return None
+    if (counts is not None and counts[i] < self.min_count):
+      return None
+    return int(buckets[i])
+
+############################# EQUITY INDEX BUILDING ############################
+
+# helper to deal a random flop or turn situation as (hole, board, num_ops)
+def _deal(street:int, num_opponents:Sequence[int], rng:Random):
+  cards = [int_to_card(c) for c in rng.sample(range(52), 5 + street)]
+  return cards[:2], cards[2:], rng.choice(num_opponents)
+
+# build an EquityIndex by sampling `num_samples` random flop and turn
+# situations and simulating their equities with `num_bootstraps` bootstraps.
+# each street's sampled equity distribution is split into `num_buckets`
+# quantile buckets. by default every opponent count up to a full table is
+# sampled. afterwards, `num_validation` fresh situations are simulated with
+# `reference_bootstraps` bootstraps as reference equities, and both the index
+# and live simulation with `num_bootstraps` bootstraps are scored against them
+# to report the accuracy-vs-speed tradeoff. the index's RMSE is recorded in
+# it. all sampling is drawn from a stream seeded by `seed`. returns the index
+# and the report as a dict.
+def build_equity_index(num_samples:int = 20000, num_bootstraps:int = 200,
+                       num_buckets:int = 32,
+                       num_opponents:Sequence[int] = tuple(range(1, 10)),
+                       min_count:int = 3, num_validation:int = 500,
+                       reference_bootstraps:int = 2000,
+                       seed:Optional[int] = None, verbose:bool = True):
+  # cover too many buckets to store in one byte each
+  if (num_buckets < 1 or num_buckets > 256):
+    raise ValueError("argument num_buckets must be between 1 and 256")
+  #
+  ########## SAMPLE EQUITIES ##########
+  rng = Random(seed)
+  fine_sums = {}  # fine key -> [street, equity sum, count]
+  coarse_sums = {}  # coarse key -> [street, equity sum, count]
+  street_equities = ([], [])
+  start = perf_counter()
+  for i in range(num_samples):
+    hole, board, num_ops = _deal(i % 2, num_opponents, rng)
+    equity = simulate_win_prob(hole, board, num_ops, num_bootstraps, rng)
+    features = board_features(hole, board, num_ops)
+    street_equities[features[0]].append(equity)
+    for sums, key in ((fine_sums, _pack(features, _FINE_RADICES)),
+                      (coarse_sums,
+                       _pack([features[j] for j in _COARSE_FIELDS],
+                             _COARSE_RADICES))):
+      entry = sums.setdefault(key, [features[0], 0.0, 0])
+      entry[1] += equity
+      entry[2] += 1
+    if (verbose and (i + 1) % 1000 == 0):
+      print(f"sampled {i + 1}/{num_samples} situations " \
+            f"({perf_counter() - start:.1f}s)")
+  build_seconds = perf_counter() - start
+  #
+  ########## BUCKET THE EQUITY DISTRIBUTIONS ##########
+  edges = empty((2, num_buckets + 1))
+  centers = empty((2, num_buckets), dtype = "float32")
+  for street in range(2):
+    equities = asarray(street_equities[street], dtype = float)
+    if (equities.shape[0] == 0):
+      equities = full(1, 0.5)
+    edges[street] = quantile(equities, [b / num_buckets
+                                        for b in range(num_buckets + 1)])
+    sample_buckets = _bucket_of(edges[street], equities)
+    for b in range(num_buckets):
+      in_bucket = equities[sample_buckets == b]
+      # empty buckets (repeated edges) fall back to their edges' midpoint
+      centers[street, b] = mean(in_bucket) if in_bucket.shape[0] > 0 else \
+        (edges[street, b] + edges[street, b + 1]) / 2
+  index = EquityIndex(
+    *_bucket_keys(fine_sums, edges, counted = True),
+    *_bucket_keys(coarse_sums, edges, counted = False),
+    centers, min_count, sorted(set(min(n, 9) for n in num_opponents)))
+  #
+  ########## REPORT ACCURACY VS SPEED ##########
+  report = _validate(index, edges, num_bootstraps, reference_bootstraps,
+                     num_validation, num_opponents, rng)
+  index.error = report["root mean squared error"]
+  report.update({"num samples":num_samples,
+                 "fine keys":int(index.fine_keys.shape[0]),
+                 "coarse keys":int(index.coarse_keys.shape[0]),
+                 "build seconds":build_seconds})
+  if (verbose):
+    for name, value in report.items():
+      print(f"{name}: {value:.6g}" if isinstance(value, float) else \
+            f"{name}: {value}")
+  return index, report
+
+# helper to get the bucket of each of `equities` given bucket `edges`
+def _bucket_of(edges:ndarray, equities):
+  return searchsorted(edges[1:-1], equities, side = "right")
+
+# helper to turn {key: [street, equity sum, count]} into sorted key, bucket
+# (and optionally count) arrays
+def _bucket_keys(sums:dict, edges:ndarray, counted:bool):
+  keys = array(sorted(sums.keys()), dtype = "int64")
+  buckets = empty(keys.shape[0], dtype = "uint8")
+  counts = empty(keys.shape[0], dtype = "uint16")
+  for i, key in enumerate(keys):
+    street, equity_sum, count = sums[int(key)]
+    buckets[i] = _bucket_of(edges[street], equity_sum / count)
+    counts[i] = min(count, 65535)
+  if (counted):
+    return keys, buckets, counts
+  return keys, buckets
+
+# helper to score index lookups and live simulation against high-bootstrap
+# reference equities on fresh situations
+def _validate(index:EquityIndex, edges:ndarray, num_bootstraps:int,
+              reference_bootstraps:int, num_validation:int,
+              num_opponents:Sequence[int], rng:Random):
+  errors = []
+  live_errors = []
+  bucket_hits = 0
+  misses = 0
+  live_seconds = 0.0
+  lookup_seconds = 0.0
+  for i in range(num_validation):
+    hole, board, num_ops = _deal(i % 2, num_opponents, rng)
+    reference = simulate_win_prob(hole, board, num_ops, reference_bootstraps,
+                                  rng)
+    start = perf_counter()
+    live = simulate_win_prob(hole, board, num_ops, num_bootstraps, rng)
+    live_seconds += perf_counter() - start
+    live_errors.append(live - reference)
+    start = perf_counter()
+    indexed = index.lookup(hole, board, num_ops)
+    lookup_seconds += perf_counter() - start
+    if (indexed is None):
+      misses += 1
+      continue
+    errors.append(indexed - reference)
+    street = len(board) - 3
+    if (_bucket_of(edges[street], reference) == \
+        _bucket_of(edges[street], indexed)):
+      bucket_hits += 1
+  errors = asarray(errors, dtype = float)
+  live_errors = asarray(live_errors, dtype = float)
+  hits = max(errors.shape[0], 1)
+  live_per = live_seconds / max(num_validation, 1)
+  lookup_per = lookup_seconds / max(num_validation, 1)
+  return {"validation situations":num_validation,
+          "coverage":1 - misses / max(num_validation, 1),
+          "mean absolute error":float(mean(np_abs(errors))) if \
+            errors.shape[0] > 0 else float("nan"),
+          "root mean squared error":float(sqrt(mean(errors ** 2))) if \
+            errors.shape[0] > 0 else float("nan"),
+          "same bucket rate":bucket_hits / hits,
+          "live simulation root mean squared error":
+            float(sqrt(mean(live_errors ** 2))) if \
+              live_errors.shape[0] > 0 else float("nan"),
+          "live seconds per situation":live_per,
+          "lookup seconds per situation":lookup_per,
+          "speedup":live_per / lookup_per if lookup_per > 0 else float("inf")}
+
+# build an index from the command line, e.g.
+# python JerryVersions/EquityIndex.py equity_index.npz --samples 50000
+if (__name__ == "__main__"):
+  parser = argparse.ArgumentParser(
+    description = "build a postflop equity index for JerryBotRational")
+  parser.add_argument("path", help = "where to write the .npz index")
+  parser.add_argument("--samples", type = int, default = 20000)
+  parser.add_argument("--bootstraps", type = int, default = 200)
+  parser.add_argument("--buckets", type = int, default = 32)
+  parser.add_argument("--opponents", type = int, nargs = "+",
+                      default = list(range(1, 10)))
+  parser.add_argument("--min-count", type = int, default = 3)
+  parser.add_argument("--validation", type = int, default = 500)
+  parser.add_argument("--reference-bootstraps", type = int, default = 2000)
+  parser.add_argument("--seed", type = int, default = None)
+  args = parser.parse_args()
+  index, _ = build_equity_index(args.samples, args.bootstraps, args.buckets,
+                                args.opponents, args.min_count,
+                                args.validation, args.reference_bootstraps,
+                                args.seed)
+  index.save(args.path)
+  print(f"index written to {args.path}")
@@ -2,14 +2,14 @@ import sys
 import os
 # look one directory up
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from texasholdem import ActionType, PlayerState
-from PokerBot import PokerBot
+from texasholdem import TexasHoldEm, ActionType, PlayerState
+from PokerBot import PokerBot, randoms_from_seed
 from JerryVersions.JerryHelpers import get_win_prob
+from JerryVersions.EquityIndex import EquityIndex
 from copy import deepcopy
-from numpy import ndarray, empty, arange, argsort, argmax, array, append, \
-  copy, delete, sum
-from numpy.random import choice, exponential
-from random import randint
+from numpy import ndarray, empty, arange, argsort, argmax, copy, delete, \
+  resize, sum
+from numpy.random import SeedSequence, default_rng
 from typing import Optional, Sequence
 
 ######################## RATIONAL JERRY CLASS DEFINITION #######################
@@ -22,7 +22,9 @@ from typing import Optional, Sequence
 class JerryBotRational(PokerBot):
   def __init__(self, adaptive:bool = True, maturity:int = 1000,
                max_memory:int = 10000, rationality:float = 20.0,
-               num_bootstraps:int = 1000):
+               num_bootstraps:int = 1000,
+               equity_index:Optional[EquityIndex] = None,
+               index_fallback:bool = True, max_index_error:float = 0.05):
     #
     ########## LONG TERM PARAMETERS ##########
     self.adaptive = adaptive  # whether to recompute bounds and update memory
@@ -30,6 +32,17 @@ class JerryBotRational(PokerBot):
     self.max_memory = max_memory    # maximum number of rows in ..._mem arrays
     self.rationality = rationality  # tuning parameter for noise in decisions
     self.num_bootstraps = num_bootstraps  # for hand strength estimation
+    # optional postflop equity index answering flop/turn hand strengths at
+    # lookup cost. whether to simulate live when a situation isn't indexed,
+    # otherwise it's given neutral strength
+    self.equity_index = equity_index
+    self.index_fallback = index_fallback
+    # cover an index too inaccurate to decide from (or never validated)
+    if (equity_index is not None and \
+        not equity_index.error <= max_index_error):
+      raise ValueError(f"equity index RMSE {equity_index.error:.3g} exceeds " \
+                       f"argument max_index_error {max_index_error:.3g}, " \
+                         "see the index's build report")
     self.c_m_mem = empty(0, dtype = float)  # call/check metric memory
     self.c_o_mem = empty(0, dtype = int)    # call/check outcome memory
     self.r_m_mem = empty(0, dtype = float)  # raise metric memory
@@ -39,9 +52,17 @@ class JerryBotRational(PokerBot):
     self.age = int(0) # how many hands the bot has played, determines maturity
     #
     ########## SHORT TERM MEMORY ##########
-    self.c_m_rec = empty(0, dtype = float)  # call/check metric recents
-    self.r_m_rec = empty(0, dtype = float)  # raise metric recents
+    # fixed-capacity buffers, only the first ..._n_rec entries are meaningful.
+    # they are reset by index at each hand end rather than reallocated.
+    self.c_m_rec = empty(16, dtype = float)  # call/check metric recents
+    self.r_m_rec = empty(16, dtype = float)  # raise metric recents
+    self.c_n_rec = int(0) # number of call/check decisions recorded this hand
+    self.r_n_rec = int(0) # number of raise decisions recorded this hand
     self.start_chips = int(0) # will hold num chips before each hand start
+    #
+    ########## RANDOM STREAMS ##########
+    # unseeded until MatchHandler hands out a stream, see set_rng()
+    self.set_rng(SeedSequence())
   
   # return a deep copy of the bot's parameters corresponding to the parameter
   # names passed in `params` argument
@@ -114,6 +135,42 @@ class JerryBotRational(PokerBot):
       self.r_o_mem = r_o_mem
     return None
   
+  # gives the bot its own random streams derived from `seed_sequence`: one for
+  # decisions, one for hand strength estimation, and a numpy one for memory
+  # trimming. called by MatchHandler before every hand, so it draws all three
+  # seeds at once and leaves the numpy stream to be built on first use
+  def set_rng(self, seed_sequence:SeedSequence):
+    self.rng, self.equity_rng, self.memory_seed = \
+      randoms_from_seed(seed_sequence, 2)
+    self.np_rng = None
+    return None
+
+  # helper to get the numpy memory trimming stream, building it if this hand
+  # hasn't needed it yet (most hands don't trim)
+  def _get_np_rng(self):
+    if (self.np_rng is None):
+      self.np_rng = default_rng(self.memory_seed)
+    return self.np_rng
+
+  # sets the match that the bot is playing and its player number, see
+  # PokerBot.set_game(). raises if the equity index wasn't built for every
+  # opponent count the table can have, as its lookups would silently miss
+  def set_game(self, game:TexasHoldEm, player_num:int):
+    super().set_game(game, player_num)
+    if (self.equity_index is not None):
+      for num_ops in range(1, game.max_players):
+        if (not self.equity_index.covers(num_ops)):
+          raise ValueError(f"equity index doesn't cover {num_ops} " \
+                           f"opponent(s), needed at a {game.max_players} " \
+                             "player table")
+    return None
+
+  # return the bounds, age and memory sizes for Telemetry
+  def get_telemetry(self):
+    return {"b1":float(self.b1), "b2":float(self.b2), "age":self.age,
+            "call/check mem size":self.c_m_mem.shape[0],
+            "raise mem size":self.r_m_mem.shape[0]}
+
   # helper to re-compute the decision boundaries
   def _update_bounds(self):
     #
@@ -136,16 +193,48 @@ class JerryBotRational(PokerBot):
     self.b2 = self.r_m_mem[argmax(outcome_sums)]
     return None
 
+  # helper to record a call/check decision's metric in short-term memory
+  def _record_call(self, hand_strength:float):
+    # grow the buffer if it's full (rare, only on very long betting rounds)
+    if (self.c_n_rec == self.c_m_rec.shape[0]):
+      self.c_m_rec = resize(self.c_m_rec, 2 * self.c_m_rec.shape[0])
+    self.c_m_rec[self.c_n_rec] = hand_strength
+    self.c_n_rec += 1
+    return None
+
+  # helper to record a raise decision's metric in short-term memory
+  def _record_raise(self, hand_strength:float):
+    # grow the buffer if it's full (rare, only on very long betting rounds)
+    if (self.r_n_rec == self.r_m_rec.shape[0]):
+      self.r_m_rec = resize(self.r_m_rec, 2 * self.r_m_rec.shape[0])
+    self.r_m_rec[self.r_n_rec] = hand_strength
+    self.r_n_rec += 1
+    return None
+
+  # helper to append recent metrics to a memory pair, with every appended
+  # outcome set to `outcome`. returns the new (metric, outcome) memory arrays.
+  def _extend_memory(self, m_mem:ndarray, o_mem:ndarray, m_rec:ndarray,
+                     n_rec:int, outcome:int):
+    # nothing to add, keep the existing arrays
+    if (n_rec == 0):
+      return m_mem, o_mem
+    n_mem = m_mem.shape[0]
+    new_m_mem = empty(n_mem + n_rec, dtype = float)
+    new_o_mem = empty(n_mem + n_rec, dtype = int)
+    new_m_mem[:n_mem] = m_mem
+    new_o_mem[:n_mem] = o_mem
+    new_m_mem[n_mem:] = m_rec[:n_rec]
+    # broadcast the scalar outcome, no temporary outcome array needed
+    new_o_mem[n_mem:] = outcome
+    return new_m_mem, new_o_mem
+
   # helper to add elements to memory and sort by metric values
   def _log_memory(self, outcome:int):
-    # duplicate outcomes for every decision to be appended to memory
-    c_o_rec = array([outcome] * self.c_m_rec.shape[0], dtype = int)
-    r_o_rec = array([outcome] * self.r_m_rec.shape[0], dtype = int)
-    # add recent decisions and outcoms to memory
-    self.c_m_mem = append(self.c_m_mem, self.c_m_rec)
-    self.r_m_mem = append(self.r_m_mem, self.r_m_rec)
-    self.c_o_mem = append(self.c_o_mem, c_o_rec)
-    self.r_o_mem = append(self.r_o_mem, r_o_rec)
+    # add recent decisions and outcomes to memory
+    self.c_m_mem, self.c_o_mem = self._extend_memory(
+      self.c_m_mem, self.c_o_mem, self.c_m_rec, self.c_n_rec, outcome)
+    self.r_m_mem, self.r_o_mem = self._extend_memory(
+      self.r_m_mem, self.r_o_mem, self.r_m_rec, self.r_n_rec, outcome)
     # sort memory by metric values
     c_sort_idxs = argsort(self.c_m_mem)
     r_sort_idxs = argsort(self.r_m_mem)
@@ -156,22 +245,39 @@ class JerryBotRational(PokerBot):
     # trim random observations down to memory maximums, if needed
     if (self.c_m_mem.shape[0] > self.max_memory):
       # randomly choose observations to remove
-      idxs_to_remove = choice(arange(self.c_m_mem.shape[0]),
-                              size = self.c_m_mem.shape[0] - self.max_memory,
-                              replace = False)
+      idxs_to_remove = self._get_np_rng().choice(
+        self.c_m_mem.shape[0], size = self.c_m_mem.shape[0] - self.max_memory,
+        replace = False)
       # remove the observations
       self.c_m_mem = delete(self.c_m_mem, idxs_to_remove)
       self.c_o_mem = delete(self.c_o_mem, idxs_to_remove)
     if (self.r_m_mem.shape[0] > self.max_memory):
       # randomly choose observations to remove
-      idxs_to_remove = choice(arange(self.r_m_mem.shape[0]),
-                              size = self.r_m_mem.shape[0] - self.max_memory,
-                              replace = False)
+      idxs_to_remove = self._get_np_rng().choice(
+        self.r_m_mem.shape[0], size = self.r_m_mem.shape[0] - self.max_memory,
+        replace = False)
       # remove the observations
       self.r_m_mem = delete(self.r_m_mem, idxs_to_remove)
       self.r_o_mem = delete(self.r_o_mem, idxs_to_remove)
     return None
 
+  # helper to get the probability of winning the hand at showdown, from the
+  # equity index when possible and by live simulation otherwise
+  def _get_win_prob(self, num_players_in:int):
+    # preflop and river are never indexed, always simulate
+    if (self.equity_index is None or len(self.game.board) not in (3, 4)):
+      return get_win_prob(self.game, self.player_num, self.num_bootstraps,
+                          self.equity_rng)
+    win_prob = self.equity_index.lookup(self.game.get_hand(self.player_num),
+                                        self.game.board, num_players_in - 1)
+    if (win_prob is not None):
+      return win_prob
+    # situation isn't indexed, simulate or fall back to neutral strength
+    if (self.index_fallback):
+      return get_win_prob(self.game, self.player_num, self.num_bootstraps,
+                          self.equity_rng)
+    return 1/num_players_in
+
   # receives "new handler" flag passed by MatchHandler
   def new_handler(self):
     pass # JerryBotRational has no "new handler" operations to perform
@@ -190,9 +296,9 @@ class JerryBotRational(PokerBot):
     if (self.adaptive):
       self._log_memory(self.game.players[self.player_num].chips - \
                        self.start_chips)
-    # reset short-term memory
-    self.c_m_rec = empty(0, dtype = float)
-    self.r_m_rec = empty(0, dtype = float)
+    # reset short-term memory (buffers are reused, only the counts reset)
+    self.c_n_rec = 0
+    self.r_n_rec = 0
     # update age
     self.age += 1
   
@@ -209,20 +315,18 @@ class JerryBotRational(PokerBot):
       if (not (self.game.players[i].state == PlayerState.OUT or
                self.game.players[i].state == PlayerState.SKIP)):
         num_players_in += 1
-    hand_strength = \
-      get_win_prob(self.game, self.player_num, self.num_bootstraps) - \
-        (1/num_players_in)
+    hand_strength = self._get_win_prob(num_players_in) - (1/num_players_in)
     # determine whether to make random decision or inteligent decision
     if (self.age >= self.maturity):
       #
       ########## MAKE INTELLIGENT DECISION ##########
       # add some rightwards bias so leftward movement of bounds is possible
-      bias = exponential(1/self.rationality)
+      bias = self.rng.expovariate(self.rationality)
       if (hand_strength + bias < self.b1):
         ##### TRY TO CHECK #####
         if (self.game.validate_move(action = ActionType.CHECK)):
           # record decision, perform check, and return
-          self.c_m_rec = append(self.c_m_rec, [hand_strength])
+          self._record_call(hand_strength)
           self.game.take_action(ActionType.CHECK)
           return None
         ##### TRY TO FOLD #####
@@ -239,12 +343,12 @@ class JerryBotRational(PokerBot):
         ##### TRY TO CALL/CHECK #####
         if (self.game.validate_move(action = ActionType.CALL)):
           # record decision, perform call, and return
-          self.c_m_rec = append(self.c_m_rec, [hand_strength])
+          self._record_call(hand_strength)
           self.game.take_action(ActionType.CALL)
           return None
         elif (self.game.validate_move(action = ActionType.CHECK)):
           # record decision, perform check, and return
-          self.c_m_rec = append(self.c_m_rec, [hand_strength])
+          self._record_call(hand_strength)
           self.game.take_action(ActionType.CHECK)
           return None
         else:
@@ -263,21 +367,21 @@ class JerryBotRational(PokerBot):
           # this means we don't have any chips left, so we can only call/check
           if (self.game.validate_move(action = ActionType.CALL)):
             # record decision, perform call, and return
-            self.c_m_rec = append(self.c_m_rec, [hand_strength])
+            self._record_call(hand_strength)
             self.game.take_action(ActionType.CALL)
             return None
           else:
             # record decision, perform check, and return
-            self.c_m_rec = append(self.c_m_rec, [hand_strength])
+            self._record_call(hand_strength)
             self.game.take_action(ActionType.CHECK)
             return None
         # if we get here, we can raise normally
-        raise_amount = randint(min_raise, max_raise)
+        raise_amount = self.rng.randint(min_raise, max_raise)
         # ensure raise is valid (should always be true)
         if (self.game.validate_move(action = ActionType.RAISE,
                                     value = raise_amount)):
           # record decision, perform raise, and return
-          self.r_m_rec = append(self.r_m_rec, [hand_strength])
+          self._record_raise(hand_strength)
           self.game.take_action(ActionType.RAISE, raise_amount)
           return None
         else:
@@ -289,7 +393,7 @@ class JerryBotRational(PokerBot):
       #
       ########## MAKE "RANDOM" DECISION (COPIED FROM TOMBOT) ##########
       # determine decision
-      if (randint(0, 1) == 1):
+      if (self.rng.randint(0, 1) == 1):
         ##### TRY TO RAISE #####
         min_raise = self.game.get_available_moves().raise_range.start
         max_raise = min(5 + self.game.get_available_moves().raise_range.start,
@@ -300,21 +404,21 @@ class JerryBotRational(PokerBot):
           # this means we don't have any chips left, so we can only call/check
           if (self.game.validate_move(action = ActionType.CALL)):
             # record decision, perform call, and return
-            self.c_m_rec = append(self.c_m_rec, [hand_strength])
+            self._record_call(hand_strength)
             self.game.take_action(ActionType.CALL)
             return None
           else:
             # record decision, perform check, and return
-            self.c_m_rec = append(self.c_m_rec, [hand_strength])
+            self._record_call(hand_strength)
             self.game.take_action(ActionType.CHECK)
             return None
         # if we get here, we can raise normally
-        raise_amount = randint(min_raise, max_raise)
+        raise_amount = self.rng.randint(min_raise, max_raise)
         # ensure raise is valid (should always be true)
         if (self.game.validate_move(action = ActionType.RAISE,
                                     value = raise_amount)):
           # record decision, perform raise, and return
-          self.r_m_rec = append(self.r_m_rec, [hand_strength])
+          self._record_raise(hand_strength)
           self.game.take_action(ActionType.RAISE, raise_amount)
           return None
         else:
@@ -326,12 +430,12 @@ class JerryBotRational(PokerBot):
         ##### TRY TO CALL/CHECK #####
         if (self.game.validate_move(action = ActionType.CALL)):
           # record decision, perform call, and return
-          self.c_m_rec = append(self.c_m_rec, [hand_strength])
+          self._record_call(hand_strength)
           self.game.take_action(ActionType.CALL)
           return None
         elif (self.game.validate_move(action = ActionType.CHECK)):
           # record decision, perform check, and return
-          self.c_m_rec = append(self.c_m_rec, [hand_strength])
+          self._record_call(hand_strength)
           self.game.take_action(ActionType.CHECK)
           return None
         else:
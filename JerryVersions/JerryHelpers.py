@@ -1,7 +1,10 @@
 from texasholdem import TexasHoldEm, Card, PlayerState
 from texasholdem.evaluator import evaluate
-from numpy import zeros, mean
-from random import randint
+from numpy import ndarray, asarray, zeros, arange, broadcast_to, \
+  bincount, concatenate, frombuffer, take_along_axis, put_along_axis, \
+  where, uint32
+from random import Random, random
+from typing import Optional, Sequence
 
 ##################### HELPERS FOR JERRY'S VARIOUS VERSIONS #####################
 
@@ -18,18 +21,36 @@ def int_to_card(num:int):
   return Card(rank_dict[num % 13] + suit_dict[num // 13])
 
 # helper to get the bootstrapped probability of winning the hand at showdown
-def get_win_prob(game:TexasHoldEm, player_num:int, num_bootstraps:int):
-  # initialize vector to hold bootstrap results
-  bootstrap_results = zeros(num_bootstraps)
-  # get bot's hand
-  my_hand = game.get_hand(player_num)
+def get_win_prob(game:TexasHoldEm, player_num:int, num_bootstraps:int,
+                 rng:Optional[Random] = None):
+  # count the number of opponents who haven't folded
+  num_ops = int(-1) # starts here to remove ourselves from the count
+  for j in range(game.max_players):
+    if (not (game.players[j].state == PlayerState.OUT or
+             game.players[j].state == PlayerState.SKIP)):
+      num_ops += 1
+  return simulate_win_prob(game.get_hand(player_num), game.board, num_ops,
+                           num_bootstraps, rng)
+
+# helper to get the bootstrapped probability of winning at showdown holding
+# `my_hand` with community cards `board` against `num_ops` opponents. works
+# without a TexasHoldEm object, e.g. for building equity indices offline.
+# cards are drawn from `rng` if given, otherwise from the global random module
+def simulate_win_prob(my_hand:Sequence[Card], board:Sequence[Card],
+                      num_ops:int, num_bootstraps:int,
+                      rng:Optional[Random] = None):
+  # uniform draws scaled to a card are cheaper than randint(0, 51)
+  draw = random if rng is None else rng.random
+  # initialize count of bootstrap wins (a plain counter, so no array is
+  # allocated per call)
+  num_wins = int(0)
   # perform the bootstrap loop
   for i in range(num_bootstraps):
     #
     ########## BOOTSTRAP COMMUNITY CARDS ##########
     # populate community cards with known community cards
     comm_cards = []
-    for card in game.board:
+    for card in board:
       comm_cards.append(card)
     # populate known_cards with all known cards
     known_cards = set()
@@ -41,26 +62,19 @@ def get_win_prob(game:TexasHoldEm, player_num:int, num_bootstraps:int):
     while (len(comm_cards) < 5):
       while (True):
         # the idea: generate a random card over and over until it's new
-        new_card = randint(0, 51)
+        new_card = int(draw() * 52)
         if (known_cards.isdisjoint({new_card})):
           known_cards.add(new_card)
           comm_cards.append(int_to_card(new_card))
           break
     #
     ########## BOOTSTRAP OPPONENT POCKETS ##########
-    # first, count the number of opponents who haven't folded
-    num_ops = int(-1) # starts here to remove ourselves from the count
-    for j in range(game.max_players):
-      if (not (game.players[j].state == PlayerState.OUT or
-               game.players[j].state == PlayerState.SKIP)):
-        num_ops += 1
-    # next, populate their pockets
     ops_pockets = [[]] * num_ops
     for pocket in ops_pockets:
       while (len(pocket) < 2):
         # the idea: generate a random card over an over until it's new
         while (True):
-          new_card = randint(0, 51)
+          new_card = int(draw() * 52)
           if (known_cards.isdisjoint({new_card})):
             known_cards.add(new_card)
             pocket.append(int_to_card(new_card))
@@ -70,8 +84,147 @@ def get_win_prob(game:TexasHoldEm, player_num:int, num_bootstraps:int):
     ops_hand_ranks = [0] * num_ops
     for j in range(num_ops):
       ops_hand_ranks[j] = evaluate(ops_pockets[j], comm_cards)
-    # determine winner, update bootstrap_results
+    # determine winner, update num_wins
     if (my_hand_rank < min(ops_hand_ranks)):
-      bootstrap_results[i] = 1
+      num_wins += 1
   # return the win probability
-  return mean(bootstrap_results)
+  return num_wins / num_bootstraps
+
+# helper tables over 13 bit rank masks (bit r set if rank r is present), used
+# to score many 7 card hands at once in numpy. _TOP_BIT is the highest rank,
+# _TOP_MASK[k] keeps the highest k ranks, _TOP_VALUE[k] encodes the highest k
+# ranks base 13 (so they compare like kickers), and _STRAIGHT_HIGH is one more
+# than the highest straight's top rank (0 if there is none, ace plays low too)
+def _rank_mask_tables():
+  top_bit = zeros(1 << 13, dtype = int)
+  top_mask = zeros((6, 1 << 13), dtype = int)
+  top_value = zeros((6, 1 << 13), dtype = int)
+  straight_high = zeros(1 << 13, dtype = int)
+  windows = [(0b1000000001111, 3)] + [(0b11111 << low, low + 4)
+                                      for low in range(9)]
+  for mask in range(1 << 13):
+    ranks = [r for r in range(12, -1, -1) if mask & (1 << r)]
+    top_bit[mask] = ranks[0] if len(ranks) > 0 else 0
+    for k in range(1, 6):
+      for r in ranks[:k]:
+        top_mask[k, mask] |= 1 << r
+      # missing kickers count as the lowest rank, only full sets compare
+      for i in range(k):
+        top_value[k, mask] = top_value[k, mask] * 13 + \
+          (ranks[i] if i < len(ranks) else 0)
+    for window, high in windows:
+      if (mask & window == window):
+        straight_high[mask] = high + 1
+  return top_bit, top_mask, top_value, straight_high
+
+_TOP_BIT, _TOP_MASK, _TOP_VALUE, _STRAIGHT_HIGH = _rank_mask_tables()
+_RANK_BITS = 1 << arange(13)
+
+# helper to score 7 card hands given as ints (see card_to_int()) along the
+# last axis of `cards`. higher scores are better hands and equal scores are
+# ties, in the same order as the evaluator's ranks (which are lower-is-better)
+def hand_scores(cards:ndarray):
+  shape = cards.shape[:-1]
+  cards = cards.reshape(-1, 7)
+  rows = arange(cards.shape[0])[:, None]
+  ranks = cards % 13
+  suits = cards // 13
+  # rank masks of ranks held at least once, twice, three and four times
+  counts = bincount((rows * 13 + ranks).ravel(),
+                    minlength = cards.shape[0] * 13).reshape(-1, 13)
+  m1 = (counts >= 1) @ _RANK_BITS
+  m2 = (counts >= 2) @ _RANK_BITS
+  m3 = (counts >= 3) @ _RANK_BITS
+  m4 = (counts >= 4) @ _RANK_BITS
+  # rank mask of the flush suit (at most one suit can have 5 of 7 cards)
+  suit_rows = (rows * 4 + suits).ravel()
+  suit_counts = bincount(suit_rows, minlength = cards.shape[0] * 4)
+  suit_masks = bincount(suit_rows, weights = (1 << ranks).ravel(),
+                        minlength = cards.shape[0] * 4).astype(int)
+  flush_mask = where(suit_counts >= 5, suit_masks, 0).reshape(-1, 4).sum(
+    axis = 1)
+  # kicker values of each category, from best to worst
+  trips = _TOP_BIT[m3]
+  pairs_left = m2 & ~(1 << trips)
+  pair = _TOP_BIT[m2]
+  categories = [
+    (_STRAIGHT_HIGH[flush_mask] > 0, _STRAIGHT_HIGH[flush_mask]),
+    (m4 != 0, _TOP_BIT[m4] * 13 + _TOP_BIT[m1 & ~(1 << _TOP_BIT[m4])]),
+    ((m3 != 0) & (pairs_left != 0), trips * 13 + _TOP_BIT[pairs_left]),
+    (flush_mask != 0, _TOP_VALUE[5][flush_mask]),
+    (_STRAIGHT_HIGH[m1] > 0, _STRAIGHT_HIGH[m1]),
+    (m3 != 0, trips * 169 + _TOP_VALUE[2][m1 & ~(1 << trips)]),
+    (_TOP_MASK[2][m2] != _TOP_MASK[1][m2],
+     _TOP_VALUE[2][m2] * 13 + _TOP_BIT[m1 & ~_TOP_MASK[2][m2]]),
+    (m2 != 0, pair * 2197 + _TOP_VALUE[3][m1 & ~(1 << pair)])]
+  # start from high card and let each better category overwrite it
+  scores = _TOP_VALUE[5][m1]
+  for category, (held, kickers) in enumerate(reversed(categories)):
+    scores = where(held, (category + 1) * 371293 + kickers, scores)
+  return scores.reshape(shape)
+
+# helper to get bootstrapped probabilities of winning at showdown for many
+# (hole cards, board) situations at once, scoring every situation's
+# bootstraps together in numpy. situation k uses `num_bootstraps[k]`
+# bootstraps drawn from `rngs[k]`, so each result only depends on its own
+# stream. like simulate_win_prob(), whose opponents all share one bootstrapped
+# pocket, each situation is played against a single random pocket.
+def batch_win_probs(hands:Sequence[Sequence[Card]],
+                    boards:Sequence[Sequence[Card]],
+                    num_bootstraps:Sequence[int], rngs:Sequence[Random]):
+  num_situations = len(hands)
+  # cover nothing to estimate
+  if (num_situations == 0):
+    return zeros(0)
+  max_bootstraps = int(max(num_bootstraps))
+  #
+  ########## REMAINING DECKS ##########
+  # each situation's unknown cards, padded to 50 (an empty board leaves 50)
+  decks = zeros((num_situations, 50), dtype = int)
+  known = zeros((num_situations, 7), dtype = int)
+  num_board = zeros(num_situations, dtype = int)
+  for k in range(num_situations):
+    known_cards = [card_to_int(card) for card in hands[k]] + \
+      [card_to_int(card) for card in boards[k]]
+    unknown = sorted(set(range(52)).difference(known_cards))
+    decks[k, :len(unknown)] = unknown
+    known[k, :len(known_cards)] = known_cards
+    num_board[k] = len(boards[k])
+  num_unknown = 50 - num_board
+  #
+  ########## DEAL BOOTSTRAPS ##########
+  # partial Fisher-Yates shuffle of the first 7 cards of every bootstrap deck,
+  # from uniform draws of each situation's own stream
+  uniforms = zeros((num_situations, max_bootstraps, 7))
+  for k in range(num_situations):
+    size = int(num_bootstraps[k]) * 7
+    uniforms[k, :num_bootstraps[k]] = \
+      (frombuffer(rngs[k].randbytes(4 * size), dtype = uint32) / \
+        2**32).reshape(-1, 7)
+  shuffled = decks[:, None, :].repeat(max_bootstraps, axis = 1)
+  for j in range(7):
+    picks = j + (uniforms[:, :, j] * (num_unknown[:, None] - j)).astype(int)
+    picked = take_along_axis(shuffled, picks[..., None], axis = 2)
+    put_along_axis(shuffled, picks[..., None],
+                   shuffled[:, :, j:j + 1], axis = 2)
+    shuffled[:, :, j:j + 1] = picked
+  #
+  ########## SCORE SHOWDOWNS ##########
+  # the board is the known board (after the hole cards in `known`) then the
+  # first drawn cards, the opponent's pocket is the 2 drawn cards after those
+  shape = (num_situations, max_bootstraps)
+  slots = arange(5)
+  drawn_slots = broadcast_to((slots - num_board[:, None]).clip(0)[:, None],
+                             shape + (5,))
+  comm_cards = where(slots < num_board[:, None, None], known[:, None, 2:],
+                     take_along_axis(shuffled, drawn_slots, axis = 2))
+  pocket_slots = broadcast_to((5 - num_board[:, None] + arange(2))[:, None],
+                              shape + (2,))
+  ops_pocket = take_along_axis(shuffled, pocket_slots, axis = 2)
+  my_pocket = broadcast_to(known[:, None, :2], shape + (2,))
+  my_scores = hand_scores(concatenate((my_pocket, comm_cards), axis = 2))
+  ops_scores = hand_scores(concatenate((ops_pocket, comm_cards), axis = 2))
+  # count wins over each situation's own bootstraps
+  counted = arange(max_bootstraps) < asarray(num_bootstraps)[:, None]
+  num_wins = ((my_scores > ops_scores) & counted).sum(axis = 1)
+  return num_wins / asarray(num_bootstraps)
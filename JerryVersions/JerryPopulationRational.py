@@ -0,0 +1,596 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from texasholdem import ActionType, PlayerState
+from PokerBot import PokerBot, randoms_from_seed
+from JerryVersions.JerryHelpers import batch_win_probs
+from copy import deepcopy
+from numpy import ndarray, empty, full, zeros, arange, argsort, argmax, \
+  asarray, broadcast_to, iinfo, inf, log, nonzero, take_along_axis, unique, \
+  where
+from numpy.random import SeedSequence, default_rng
+from typing import Optional, Sequence
+
+#################### RATIONAL JERRY POPULATION CLASS DEFINITION ################
+
+# class JerryPopulationRational
+# a population of N Rational Jerry agents stored struct-of-arrays style: every
+# per-agent parameter, bound, age and memory lives in a shared array indexed by
+# agent number. decisions for all agents seated across many tables are made in
+# one vectorized step, and bounds/memories are updated for many agents at once.
+# each agent's decision rule is identical to JerryBotRational's. individual
+# agents are seated at a MatchHandler through get_seat(), which returns a normal
+# PokerBot. all randomness comes from each seat's own streams (handed out by
+# MatchHandler), so every table stays replayable even when batched.
+class JerryPopulationRational:
+  def __init__(self, num_agents:int, adaptive = True, maturity = 1000,
+               max_memory = 10000, rationality = 20.0,
+               num_bootstraps = 1000):
+    # cover too few agents (at least one required)
+    if (num_agents < 1):
+      raise ValueError("too few agents requested, at least one required")
+    self.num_agents = num_agents
+    #
+    ########## LONG TERM PARAMETERS ##########
+    # each may be passed as a scalar (shared) or a sequence (one per agent)
+    self.adaptive = self._per_agent(adaptive, bool, "adaptive")
+    self.maturity = self._per_agent(maturity, int, "maturity")
+    self.max_memory = self._per_agent(max_memory, int, "max_memory")
+    self.rationality = self._per_agent(rationality, float, "rationality")
+    self.num_bootstraps = self._per_agent(num_bootstraps, int,
+                                          "num_bootstraps")
+    self.b1 = zeros(num_agents, dtype = float)  # fold vs call/check bounds
+    self.b2 = zeros(num_agents, dtype = float)  # call/check vs raise bounds
+    self.age = zeros(num_agents, dtype = int)   # hands played by each agent
+    # memories are (num_agents, capacity) rows sorted by metric, only the first
+    # ..._n_mem entries of each row are meaningful. unused slots hold an
+    # infinite metric (so they sort last) and a zero outcome. capacity starts
+    # small and grows as memories fill up.
+    mem_capacity = 16
+    self.c_m_mem = full((num_agents, mem_capacity), inf)  # call/check metrics
+    self.c_o_mem = zeros((num_agents, mem_capacity), dtype = int) # outcomes
+    self.c_n_mem = zeros(num_agents, dtype = int)  # call/check memory sizes
+    self.r_m_mem = full((num_agents, mem_capacity), inf)  # raise metrics
+    self.r_o_mem = zeros((num_agents, mem_capacity), dtype = int) # outcomes
+    self.r_n_mem = zeros(num_agents, dtype = int)  # raise memory sizes
+    #
+    ########## SHORT TERM MEMORY ##########
+    # fixed-capacity buffers, reset by index at each hand end
+    self.c_m_rec = empty((num_agents, 16), dtype = float) # call/check recents
+    self.r_m_rec = empty((num_agents, 16), dtype = float) # raise recents
+    self.c_n_rec = zeros(num_agents, dtype = int) # call/check recent counts
+    self.r_n_rec = zeros(num_agents, dtype = int) # raise recent counts
+    #
+    ########## SEATS ##########
+    # one PokerBot per agent, an agent can only sit at one table at a time
+    self.seats = [JerryPopulationSeat(self, i) for i in range(num_agents)]
+
+  # helper to broadcast a scalar or per-agent sequence to a per-agent array
+  def _per_agent(self, value, dtype, name:str):
+    try:
+      return broadcast_to(asarray(value, dtype = dtype),
+                          (self.num_agents,)).copy()
+    except ValueError:
+      raise ValueError(f"argument {name} must be a scalar or have one entry " \
+                       f"per agent ({self.num_agents})")
+
+  # return the PokerBot seat for agent number `agent`, to be passed to a
+  # MatchHandler like any other bot
+  def get_seat(self, agent:int):
+    # cover agent out of range
+    if (agent < 0 or agent >= self.num_agents):
+      raise ValueError("argument agent not applicable for population")
+    return self.seats[agent]
+
+  # return a deep copy of agent number `agent`'s parameters corresponding to
+  # the parameter names passed in `params` argument. names match those used by
+  # JerryBotRational.get_parameters()
+  def get_agent_parameters(self, agent:int, params:Sequence[str] = []):
+    # matches names to params
+    names_to_params = {
+      "b1":float(self.b1[agent]), "b2":float(self.b2[agent]),
+      "adaptive":bool(self.adaptive[agent]), "age":int(self.age[agent]),
+      "maturity":int(self.maturity[agent]),
+      "max memory":int(self.max_memory[agent]),
+      "rationality":float(self.rationality[agent]),
+      "num boostraps":int(self.num_bootstraps[agent]),
+      "call/check metric mem":self.c_m_mem[agent, :self.c_n_mem[agent]],
+      "call/check outcome mem":self.c_o_mem[agent, :self.c_n_mem[agent]],
+      "raise metric mem":self.r_m_mem[agent, :self.r_n_mem[agent]],
+      "raise outcome mem":self.r_o_mem[agent, :self.r_n_mem[agent]]}
+    # cover singleton list, return one element
+    if (len(params) == 1):
+      if ({params[0]}.isdisjoint(names_to_params.keys())):
+        raise ValueError( \
+          f"JerryPopulationRational has no parameter \"{params[0]}\"")
+      return deepcopy(names_to_params[params[0]])
+    # cover empty list, return all
+    if (len(params) == 0):
+      params = ["b1", "b2", "adaptive", "age", "maturity", "max memory",
+                "rationality", "num boostraps", "call/check metric mem",
+                "call/check outcome mem", "raise metric mem",
+                "raise outcome mem"]
+    # initialize returned collection
+    output = ()
+    # iterate through params, add elements to output
+    for param in params:
+      if ({param}.isdisjoint(names_to_params.keys())):
+        raise ValueError( \
+          f"JerryPopulationRational has no parameter \"{param}\"")
+      output = output + (names_to_params[param],)
+    # return deep copy of output
+    return deepcopy(output)
+
+  # set agent number `agent`'s parameters, mirrors
+  # JerryBotRational.set_parameters(). memories passed in must be sorted by
+  # metric, as they would be if taken from get_agent_parameters()
+  def set_agent_parameters(self, agent:int, b1:Optional[float] = None,
+                           b2:Optional[float] = None,
+                           adaptive:Optional[bool] = None,
+                           age:Optional[int] = None,
+                           maturity:Optional[int] = None,
+                           max_memory:Optional[int] = None,
+                           rationality:Optional[float] = None,
+                           num_bootstraps:Optional[int] = None,
+                           c_m_mem:Optional[ndarray] = None,
+                           c_o_mem:Optional[ndarray] = None,
+                           r_m_mem:Optional[ndarray] = None,
+                           r_o_mem:Optional[ndarray] = None):
+    if b1 is not None:
+      self.b1[agent] = b1
+    if b2 is not None:
+      self.b2[agent] = b2
+    if adaptive is not None:
+      self.adaptive[agent] = adaptive
+    if age is not None:
+      self.age[agent] = age
+    if maturity is not None:
+      self.maturity[agent] = maturity
+    if max_memory is not None:
+      self.max_memory[agent] = max_memory
+    if rationality is not None:
+      self.rationality[agent] = rationality
+    if num_bootstraps is not None:
+      self.num_bootstraps[agent] = num_bootstraps
+    if c_m_mem is not None:
+      self.c_m_mem, self.c_n_mem[agent] = \
+        self._set_memory_row(self.c_m_mem, agent, c_m_mem, inf)
+    if c_o_mem is not None:
+      self.c_o_mem, _ = self._set_memory_row(self.c_o_mem, agent, c_o_mem, 0)
+    if r_m_mem is not None:
+      self.r_m_mem, self.r_n_mem[agent] = \
+        self._set_memory_row(self.r_m_mem, agent, r_m_mem, inf)
+    if r_o_mem is not None:
+      self.r_o_mem, _ = self._set_memory_row(self.r_o_mem, agent, r_o_mem, 0)
+    return None
+
+  # helper to overwrite one memory row, growing the buffer if needed. returns
+  # the (possibly regrown) buffer and the row's new length
+  def _set_memory_row(self, buffer:ndarray, agent:int, values:ndarray,
+                      pad_value):
+    values = asarray(values)
+    buffer = self._grow_columns(buffer, values.shape[0], pad_value)
+    buffer[agent, :] = pad_value
+    buffer[agent, :values.shape[0]] = values
+    return buffer, values.shape[0]
+
+  # helper to return `buffer` with at least `min_columns` columns, padding any
+  # new columns with `pad_value`. capacity doubles so growth is rare, but
+  # never past `max_columns` (if given) unless more are needed
+  def _grow_columns(self, buffer:ndarray, min_columns:int, pad_value,
+                    max_columns:Optional[int] = None):
+    if (min_columns <= buffer.shape[1]):
+      return buffer
+    new_columns = 2 * buffer.shape[1]
+    if (max_columns is not None):
+      new_columns = min(new_columns, max_columns)
+    new_columns = max(min_columns, new_columns)
+    new_buffer = full((buffer.shape[0], new_columns), pad_value,
+                      dtype = buffer.dtype)
+    new_buffer[:, :buffer.shape[1]] = buffer
+    return new_buffer
+
+  # helper to re-compute the decision boundaries of the agents in `agents`
+  # all at once. agents with empty memories keep their current bounds
+  def _update_bounds(self, agents:ndarray):
+    if (agents.shape[0] == 0):
+      return None
+    # only the used columns of each memory are looked at
+    width = max(int(self.c_n_mem[agents].max()), 1)
+    self.b1[agents] = self._best_bounds(self.c_m_mem[agents, :width],
+                                        self.c_o_mem[agents, :width],
+                                        self.c_n_mem[agents], self.b1[agents])
+    width = max(int(self.r_n_mem[agents].max()), 1)
+    self.b2[agents] = self._best_bounds(self.r_m_mem[agents, :width],
+                                        self.r_o_mem[agents, :width],
+                                        self.r_n_mem[agents], self.b2[agents])
+    return None
+
+  # helper to find, for every row, the metric value that maximizes the sum of
+  # all outcomes at greater or equal indices (see JerryBotRational)
+  def _best_bounds(self, m_mem:ndarray, o_mem:ndarray, n_mem:ndarray,
+                   current:ndarray):
+    # at all indices, the sum of all outcomes in greater or equal indices
+    # (unused slots hold zero outcomes, so they don't affect the sums)
+    outcome_sums = o_mem[:, ::-1].cumsum(axis = 1)[:, ::-1]
+    # exclude unused slots from the argmax
+    columns = arange(m_mem.shape[1])
+    outcome_sums = where(columns < n_mem[:, None], outcome_sums,
+                         iinfo(outcome_sums.dtype).min)
+    best = argmax(outcome_sums, axis = 1)
+    bounds = m_mem[arange(m_mem.shape[0]), best]
+    # keep current bounds for agents without any memory
+    return where(n_mem > 0, bounds, current)
+
+  # helper to add recent decisions of the agents in `agents` to memory with
+  # associated `outcomes`, sort by metric values and trim to memory maximums
+  def _log_memory(self, agents:ndarray, outcomes:ndarray):
+    if (agents.shape[0] == 0):
+      return None
+    self.c_m_mem, self.c_o_mem = self._log_memory_pair(
+      self.c_m_mem, self.c_o_mem, self.c_n_mem, self.c_m_rec, self.c_n_rec,
+      agents, outcomes)
+    self.r_m_mem, self.r_o_mem = self._log_memory_pair(
+      self.r_m_mem, self.r_o_mem, self.r_n_mem, self.r_m_rec, self.r_n_rec,
+      agents, outcomes)
+    return None
+
+  # helper to log recents into one (metric, outcome) memory pair. `n_mem` is
+  # updated in place, returns the (possibly regrown) memory arrays
+  def _log_memory_pair(self, m_mem:ndarray, o_mem:ndarray, n_mem:ndarray,
+                       m_rec:ndarray, n_rec:ndarray, agents:ndarray,
+                       outcomes:ndarray):
+    #
+    ########## ADD RECENTS TO MEMORY ##########
+    num_new = n_rec[agents]
+    # only the columns in use once the recents are added are sorted and
+    # trimmed. rows never need more than max memory plus one hand's recents
+    width = int((n_mem[agents] + num_new).max())
+    m_mem = self._grow_columns(m_mem, width, inf,
+                               int(self.max_memory.max()) + m_rec.shape[1])
+    o_mem = self._grow_columns(o_mem, m_mem.shape[1], 0)
+    # every (row, column) pair of recents to copy, and where they go
+    rows, columns = nonzero(arange(m_rec.shape[1]) < num_new[:, None])
+    targets = n_mem[agents][rows] + columns
+    m_mem[agents[rows], targets] = m_rec[agents[rows], columns]
+    o_mem[agents[rows], targets] = outcomes[rows]
+    n_mem[agents] += num_new
+    #
+    ########## SORT MEMORY BY METRIC VALUES ##########
+    self._sort_rows(m_mem, o_mem, agents, width)
+    #
+    ########## TRIM RANDOM OBSERVATIONS DOWN TO MEMORY MAXIMUMS ##########
+    excess = n_mem[agents] - self.max_memory[agents]
+    over = agents[excess > 0]
+    if (over.shape[0] > 0):
+      excess = excess[excess > 0]
+      # randomly rank each row's observations, remove the lowest ranked ones.
+      # each row's keys come from its own seat's memory stream
+      keys = full((over.shape[0], width), inf)
+      for row, agent in enumerate(over):
+        keys[row, :n_mem[agent]] = \
+          self.seats[agent]._get_np_rng().random(n_mem[agent])
+      ranks = argsort(argsort(keys, axis = 1), axis = 1)
+      remove = ranks < excess[:, None]
+      m_rows = m_mem[over, :width]
+      o_rows = o_mem[over, :width]
+      m_rows[remove] = inf
+      o_rows[remove] = 0
+      m_mem[over, :width] = m_rows
+      o_mem[over, :width] = o_rows
+      n_mem[over] = self.max_memory[over]
+      # removed observations must move to the unused end of their rows
+      self._sort_rows(m_mem, o_mem, over, width)
+    return m_mem, o_mem
+
+  # helper to sort the rows `agents` of a memory pair by metric values,
+  # looking only at their first `width` columns (the rest must be unused)
+  def _sort_rows(self, m_mem:ndarray, o_mem:ndarray, agents:ndarray,
+                 width:int):
+    m_rows = m_mem[agents, :width]
+    sort_idxs = argsort(m_rows, axis = 1, kind = "stable")
+    m_mem[agents, :width] = take_along_axis(m_rows, sort_idxs, axis = 1)
+    o_mem[agents, :width] = take_along_axis(o_mem[agents, :width], sort_idxs,
+                                            axis = 1)
+    return None
+
+  # helper to record decision metrics of `agents` in short-term memory
+  def _record(self, m_rec:ndarray, n_rec:ndarray, agents:ndarray,
+              hand_strengths:ndarray):
+    if (agents.shape[0] == 0):
+      return m_rec
+    # grow the buffer if any row is full (rare, only on very long rounds)
+    m_rec = self._grow_columns(m_rec, int(n_rec[agents].max()) + 1, 0.0)
+    m_rec[agents, n_rec[agents]] = hand_strengths
+    n_rec[agents] += 1
+    return m_rec
+
+  # helper to get the agent numbers of `seats`, raising if any agent appears
+  # more than once (an agent can only sit at one table at a time, and batched
+  # updates to a repeated agent would be lost)
+  def _get_agents(self, seats:Sequence["JerryPopulationSeat"]):
+    agents = asarray([seat.agent for seat in seats], dtype = int)
+    if (unique(agents).shape[0] != agents.shape[0]):
+      raise ValueError("an agent is seated at more than one table, each " \
+                       "agent can only sit at one table at a time")
+    return agents
+
+  # receives "hand start" flags for all of `seats` at once
+  def hand_starts(self, seats:Sequence["JerryPopulationSeat"]):
+    # record number of chips from before the hand
+    for seat in seats:
+      seat.start_chips = seat.game.players[seat.player_num].chips
+    # recompute decision boundaries of adaptive and mature agents together
+    agents = self._get_agents(seats)
+    agents = agents[self.adaptive[agents] &
+                    (self.age[agents] >= self.maturity[agents])]
+    self._update_bounds(agents)
+    return None
+
+  # receives "hand end" flags for all of `seats` at once
+  def hand_ends(self, seats:Sequence["JerryPopulationSeat"]):
+    agents = self._get_agents(seats)
+    outcomes = asarray([seat.game.players[seat.player_num].chips - \
+                        seat.start_chips for seat in seats], dtype = int)
+    # add hand data into long-term memory with associated outcomes
+    adaptive = self.adaptive[agents]
+    self._log_memory(agents[adaptive], outcomes[adaptive])
+    # reset short-term memory (buffers are reused, only the counts reset)
+    self.c_n_rec[agents] = 0
+    self.r_n_rec[agents] = 0
+    # update ages
+    self.age[agents] += 1
+    return None
+
+  # make one decision for every seat in `seats`, each of which must currently
+  # be the player to act at its own table. hand strengths of all seats are
+  # estimated together (see batch_win_probs()), and the decisions themselves
+  # are made in one vectorized step.
+  def make_decisions(self, seats:Sequence["JerryPopulationSeat"]):
+    #
+    ########## COVER EXCEPTIONS ##########
+    for seat in seats:
+      seat._check_integrity()
+    agents = self._get_agents(seats)
+    #
+    ########## GET HAND EVALUATION METRICS ##########
+    # each seat's uniform draws are taken from its own stream here, then
+    # transformed for all seats at once below
+    num_players_in = empty(len(seats), dtype = int)
+    uniforms = empty(len(seats), dtype = float)
+    coins = empty(len(seats), dtype = int)
+    for k, seat in enumerate(seats):
+      num_players_in[k] = 0
+      for i in range(seat.game.max_players):
+        if (not (seat.game.players[i].state == PlayerState.OUT or
+                 seat.game.players[i].state == PlayerState.SKIP)):
+          num_players_in[k] += 1
+      uniforms[k] = seat.rng.random()
+      coins[k] = seat.rng.randint(0, 1)
+    # every seat's bootstraps are drawn from its own equity stream and scored
+    # together
+    hand_strengths = batch_win_probs(
+      [seat.game.get_hand(seat.player_num) for seat in seats],
+      [seat.game.board for seat in seats], self.num_bootstraps[agents],
+      [seat.equity_rng for seat in seats]) - 1/num_players_in
+    #
+    ########## MAKE DECISIONS ##########
+    # decision codes: 0 is check/fold, 1 is call/check, 2 is raise
+    mature = self.age[agents] >= self.maturity[agents]
+    # intelligent decisions, with rightwards bias so leftward movement of
+    # bounds is possible
+    # (exponential bias by inversion of the uniform draws)
+    biased = hand_strengths - log(1 - uniforms)/self.rationality[agents]
+    smart = where(biased < self.b1[agents], 0,
+                  where(biased < self.b2[agents], 1, 2))
+    # "random" decisions (copied from TomBot)
+    coin = where(coins == 1, 2, 1)
+    decisions = where(mature, smart, coin)
+    #
+    ########## PERFORM DECISIONS ##########
+    # perform each decision at its table, noting which were calls and raises
+    recorded = empty(len(seats), dtype = int)
+    for k, seat in enumerate(seats):
+      recorded[k] = seat._take_decision(int(decisions[k]), bool(mature[k]))
+    # record decisions in short-term memory
+    self.c_m_rec = self._record(self.c_m_rec, self.c_n_rec,
+                                agents[recorded == 1],
+                                hand_strengths[recorded == 1])
+    self.r_m_rec = self._record(self.r_m_rec, self.r_n_rec,
+                                agents[recorded == 2],
+                                hand_strengths[recorded == 2])
+    return None
+
+  # run a single hand at every MatchHandler in `handlers` in lockstep. at each
+  # step, all population seats to act across all tables decide together in
+  # one make_decisions() call, other bots decide individually. mirrors
+  # MatchHandler.run_hand().
+  def run_hands(self, handlers:Sequence):
+    #
+    ########## COVER EXCEPTIONS ##########
+    for handler in handlers:
+      if (handler.game is None):
+        raise Exception("no game has been created, call start_game() method")
+      if (not handler.game.is_game_running()):
+        raise Exception("current game has ended, call start_game() method")
+      if (handler.game.is_hand_running()):
+        raise Exception("there is a hand already running, if you see this, " \
+                        "something went seriously wrong")
+    #
+    ########## RUN THE HANDS ##########
+    # start the hands, safeguarding against the last hand being the one that
+    # ended the match
+    running = []
+    for handler in handlers:
+      if (handler.start_hand()):
+        running.append(handler)
+    # the hands are now actually underway, send all bots the "hand start" flag
+    seats, others = self._split_bots(running)
+    for bot in others:
+      bot.hand_start()
+    self.hand_starts(seats)
+    # bots make decisions until all hands end (hands can already be over if
+    # blinds put everyone all in)
+    active = [handler for handler in running
+              if handler.game.is_hand_running()]
+    while (len(active) > 0):
+      to_act = []
+      for handler in active:
+        bot = handler.bots[handler.game.current_player]
+        if (isinstance(bot, JerryPopulationSeat) and bot.population is self):
+          to_act.append(bot)
+        else:
+          bot.make_decision()
+      self.make_decisions(to_act)
+      active = [handler for handler in active
+                if handler.game.is_hand_running()]
+    # now that the hands have ended, send all bots the "hand end" flag
+    for bot in others:
+      bot.hand_end()
+    self.hand_ends(seats)
+    for handler in running:
+      handler.end_hand()
+    return None
+
+  # helper to split all bots at `handlers` into this population's seats and
+  # every other bot
+  def _split_bots(self, handlers:Sequence):
+    seats = []
+    others = []
+    for handler in handlers:
+      for bot in handler.bots:
+        if (isinstance(bot, JerryPopulationSeat) and bot.population is self):
+          seats.append(bot)
+        else:
+          others.append(bot)
+    return seats, others
+
+###################### POPULATION SEAT CLASS DEFINITION #######################
+
+# class JerryPopulationSeat
+# a PokerBot standing in for one agent of a JerryPopulationRational, so that
+# the agent can be seated at a MatchHandler like any other bot. all of the
+# agent's state lives in the population's shared arrays.
+class JerryPopulationSeat(PokerBot):
+  def __init__(self, population:JerryPopulationRational, agent:int):
+    self.population = population  # the population holding this agent's state
+    self.agent = agent  # this agent's index in the population's arrays
+    self.start_chips = int(0) # will hold num chips before each hand start
+    self.game = None
+    # unseeded until MatchHandler hands out a stream
+    self.set_rng(SeedSequence())
+
+  # return a deep copy of the agent's parameters, see
+  # JerryPopulationRational.get_agent_parameters()
+  def get_parameters(self, params:Sequence[str] = []):
+    return self.population.get_agent_parameters(self.agent, params)
+
+  # set the agent's parameters, see
+  # JerryPopulationRational.set_agent_parameters()
+  def set_parameters(self, **kwargs):
+    return self.population.set_agent_parameters(self.agent, **kwargs)
+
+  # return the agent's bounds, age and memory sizes for Telemetry
+  def get_telemetry(self):
+    population = self.population
+    return {"b1":float(population.b1[self.agent]),
+            "b2":float(population.b2[self.agent]),
+            "age":int(population.age[self.agent]),
+            "call/check mem size":int(population.c_n_mem[self.agent]),
+            "raise mem size":int(population.r_n_mem[self.agent])}
+
+  # gives the seat its own random streams derived from `seed_sequence`, as
+  # JerryBotRational.set_rng() does: one for decisions, one for hand strength
+  # estimation, and a numpy one for memory trimming, built on first use.
+  # called by MatchHandler before every hand
+  def set_rng(self, seed_sequence:SeedSequence):
+    self.rng, self.equity_rng, self.memory_seed = \
+      randoms_from_seed(seed_sequence, 2)
+    self.np_rng = None
+    return None
+
+  # helper to get the numpy memory trimming stream, building it if this hand
+  # hasn't needed it yet (most hands don't trim)
+  def _get_np_rng(self):
+    if (self.np_rng is None):
+      self.np_rng = default_rng(self.memory_seed)
+    return self.np_rng
+
+  # receives "new handler" flag passed by MatchHandler
+  def new_handler(self):
+    pass # JerryPopulationSeat has no "new handler" operations to perform
+
+  # receives "hand start" flag passed by MatchHandler
+  def hand_start(self):
+    self.population.hand_starts([self])
+
+  # receives "hand end" flag passed by MatchHandler
+  def hand_end(self):
+    self.population.hand_ends([self])
+
+  # make a decision in the current game as the assigned player number
+  def make_decision(self):
+    self.population.make_decisions([self])
+
+  # helper to perform decision code `decision` (0 is check/fold, 1 is
+  # call/check, 2 is raise) in the current game. returns which metric recents
+  # the decision should be recorded in (0 for none, 1 for call/check, 2 for
+  # raise). mirrors JerryBotRational.make_decision()
+  def _take_decision(self, decision:int, mature:bool):
+    if (decision == 0):
+      ##### TRY TO CHECK #####
+      if (self.game.validate_move(action = ActionType.CHECK)):
+        self.game.take_action(ActionType.CHECK)
+        return 1
+      ##### TRY TO FOLD #####
+      if (self.game.validate_move(action = ActionType.FOLD)):
+        self.game.take_action(ActionType.FOLD)
+        return 0
+      else:
+        # cover when folding is invalid (this should be impossible)
+        raise Exception("JerryPopulationSeat's attempted fold is invalid " \
+                        "(this should be impossible, if you're seeing " \
+                          "this, something went seriously wrong)")
+    elif (decision == 1):
+      ##### TRY TO CALL/CHECK #####
+      if (self.game.validate_move(action = ActionType.CALL)):
+        self.game.take_action(ActionType.CALL)
+        return 1
+      elif (self.game.validate_move(action = ActionType.CHECK)):
+        self.game.take_action(ActionType.CHECK)
+        return 1
+      else:
+        # cover when neither are allowed (should be impossible)
+        raise Exception("JerryPopulationSeat is trying to call or check but " \
+                        "cannot (this should be impossible, if you're " \
+                          "seeing this, something went seriously wrong)")
+    else:
+      ##### TRY TO RAISE #####
+      # mature agents raise by a wider margin, as in JerryBotRational
+      spread = 10 if mature else 5
+      min_raise = self.game.get_available_moves().raise_range.start
+      max_raise = min(spread + self.game.get_available_moves().raise_range.start,
+                      self.game.players[self.game.current_player].chips,
+                      self.game.get_available_moves().raise_range.stop-1)
+      # cover when min_raise exceeds max_raise
+      if (min_raise > max_raise):
+        # this means we don't have any chips left, so we can only call/check
+        if (self.game.validate_move(action = ActionType.CALL)):
+          self.game.take_action(ActionType.CALL)
+          return 1
+        else:
+          self.game.take_action(ActionType.CHECK)
+          return 1
+      # if we get here, we can raise normally
+      raise_amount = self.rng.randint(min_raise, max_raise)
+      # ensure raise is valid (should always be true)
+      if (self.game.validate_move(action = ActionType.RAISE,
+                                  value = raise_amount)):
+        self.game.take_action(ActionType.RAISE, raise_amount)
+        return 2
+      else:
+        # cover when attempted raise is invalid (should be impossible)
+        raise Exception("JerryPopulationSeat's attempted raise is invalid " \
+                        "(this should be impossible, if you're seeing " \
+                          "this, something went seriously wrong)")
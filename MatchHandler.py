@@ -1,20 +1,76 @@
 from texasholdem import TexasHoldEm
-from typing import Sequence
-from PokerBot import PokerBot
+from texasholdem.card.deck import Deck
+from importlib import import_module
+from numpy.random import SeedSequence
+from random import Random
+from threading import local
+from typing import Optional, Sequence
+from PokerBot import PokerBot, random_from_seed
+from Telemetry import Telemetry
+
+# the module whose Deck TexasHoldEm.start_hand() deals from (imported by name,
+# as the texasholdem.game package shadows it with an attribute)
+texasholdem_game = import_module("texasholdem.game.game")
+
+########################## SEEDED DECK CLASS DEFINITION ########################
+
+# a texasholdem Deck shuffled from a given random stream instead of the global
+# random module. MatchHandler has TexasHoldEm build these while starting a
+# hand, so every card dealt (hole cards and board alike) comes from the hand's
+# seeded deck stream.
+class _SeededDeck(Deck):
+  def __init__(self, rng:Random):
+    self.rng = rng
+    super().__init__()
+
+  # shuffle the remaining cards using the deck's own stream
+  def shuffle(self):
+    self.rng.shuffle(self.cards)
+
+# the deck stream of the hand each thread is currently starting, if any. kept
+# per thread so handlers running in parallel threads never deal from each
+# other's streams
+_deck_streams = local()
+
+# factory installed (once, at import) in place of the Deck TexasHoldEm builds
+# while starting a hand. deals from the calling thread's seeded deck stream
+# while MatchHandler.start_hand() is running, and is a plain Deck otherwise
+def _make_deck():
+  rng = getattr(_deck_streams, "rng", None)
+  if (rng is None):
+    return Deck()
+  return _SeededDeck(rng)
+
+texasholdem_game.Deck = _make_deck
 
 ######################## MATCH HANDLER CLASS DEFINITION ########################
 
 # class that automates running Texas Holdem' matches and recording match
 # histories. should be useful regarding the training and evaluations
 # of our agents, as well as letting users play against them.
+# all randomness is seeded: every hand gets its own independent streams for
+# each bot and for the deck, derived from (seed, table, match, hand), so any
+# hand can be replayed exactly. give parallel tables sharing a seed different
+# `table` numbers. pass a Telemetry object to watch long run_matches() calls.
 class MatchHandler:
-  def __init__(self, bots:Sequence[PokerBot]):
+  def __init__(self, bots:Sequence[PokerBot], seed:Optional[int] = None,
+               table:int = 0, telemetry:Optional[Telemetry] = None):
     # cover too few bots (at least two required)
     if (len(bots) < 2):
       raise Exception("too few bots passed in, at least two required")
     self.bots = bots
     self.num_bots = len(self.bots)
     self.match_histories = None # TODO: IMPLEMENT ME.
+    # root seed (drawn from the OS if not given, kept so runs can be replayed)
+    self.seed = SeedSequence(seed).entropy
+    self.table = table
+    self.match_num = int(-1)  # index of the current match, counts from 0
+    self.hand_num = int(0)    # index of the next hand in the current match
+    # progress counters, read by telemetry from its own thread
+    self.telemetry = telemetry
+    self.num_hands_played = int(0)  # hands played across all matches
+    self.chip_totals = [0] * self.num_bots  # chips won by each bot, summed
+    self.start_chips = [0] * self.num_bots  # chips before the current hand
     # send all bots a "new handler" flag
     for i in range(self.num_bots):
       self.bots[i].new_handler()
@@ -23,9 +79,58 @@ class MatchHandler:
   # all bots to the match. only useful in conjunction with run_hand() method
   # for step-by-step matches or when called internally by run_match() method.
   def start_game(self, buyin:int, big_blind:int, small_blind:int):
+    self.match_num += 1
+    self.hand_num = 0
     self.game = TexasHoldEm(buyin, big_blind, small_blind, self.num_bots)
+    # TexasHoldEm picks the first button globally, re-pick it from our stream
+    self.game.btn_loc = random_from_seed(
+      self.get_seed_sequence(self.match_num)).randrange(self.num_bots)
     for i in range(self.num_bots):
       self.bots[i].set_game(self.game, i)
+
+  # return the seed sequence that hand number `hand_num` of match number
+  # `match_num` draws its streams from, or that the match itself draws from
+  # if `hand_num` isn't given
+  def get_seed_sequence(self, match_num:int, hand_num:Optional[int] = None):
+    spawn_key = (self.table, match_num) if hand_num is None else \
+      (self.table, match_num, hand_num)
+    return SeedSequence(self.seed, spawn_key = spawn_key)
+
+  # set which hand of the current match the next run_hand() call plays, so its
+  # random streams are exactly those of the original run. to replay a hand,
+  # restore the game and bots to their state before it, then seek() and
+  # run_hand().
+  def seek(self, hand_num:int):
+    self.hand_num = hand_num
+    return None
+
+  # start the next hand of the current match with its own seeded streams for
+  # every bot and for the deck. returns whether the hand is underway (the
+  # previous hand may have ended the match). used internally by run_hand()
+  def start_hand(self):
+    streams = self.get_seed_sequence(self.match_num,
+                                     self.hand_num).spawn(self.num_bots + 1)
+    self.hand_num += 1
+    for i in range(self.num_bots):
+      self.bots[i].set_rng(streams[i])
+      self.start_chips[i] = self.game.players[i].chips
+    # TexasHoldEm builds its deck inside start_hand() (which may play out the
+    # whole hand when blinds put everyone all in), so have it build a deck
+    # shuffled from our stream before any card is dealt
+    _deck_streams.rng = random_from_seed(streams[self.num_bots])
+    try:
+      self.game.start_hand()
+    finally:
+      _deck_streams.rng = None
+    return self.game.is_game_running()
+
+  # finish the current hand's bookkeeping once it has ended: count it and add
+  # each bot's chips won or lost to its total. used internally by run_hand()
+  def end_hand(self):
+    for i in range(self.num_bots):
+      self.chip_totals[i] += self.game.players[i].chips - self.start_chips[i]
+    self.num_hands_played += 1
+    return None
   
   # run through a single hand of play in the current match, if it exists and
   # hasn't already ended. can only be used after calling start_game() method,
@@ -42,10 +147,9 @@ class MatchHandler:
                       "something went seriously wrong")
     #
     ########## RUN THE HAND ##########
-    # start the hand
-    self.game.start_hand()
-    # safeguard against the last hand being the one that ended the match
-    if (not self.game.is_game_running()):
+    # start the hand, safeguarding against the last hand being the one that
+    # ended the match
+    if (not self.start_hand()):
       return None
     # the hand is now actually underway, send all bots the "hand start" flag
     for i in range(self.num_bots):
@@ -56,6 +160,7 @@ class MatchHandler:
     # now that the hand has ended, send all bots the "hand end" flag
     for i in range(self.num_bots):
       self.bots[i].hand_end()
+    self.end_hand()
     return None
   
   # create a TexasHoldEm object using arguments as match parameters, and run
@@ -72,9 +177,15 @@ class MatchHandler:
     return None
   
   # perform run_match num_matches times. records the match history if desired.
+  # samples telemetry throughout, if the handler has it.
   # TODO: IMPLEMENT RECORDING MATCH HISTORY
   def run_matches(self, num_matches:int, buyin:int, big_blind:int,
                   small_blind:int, record_history:bool = False):
-    for i in range(num_matches):
-      self.run_match(buyin, big_blind, small_blind, record_history)
+    started = self.telemetry is not None and self.telemetry.start(self)
+    try:
+      for i in range(num_matches):
+        self.run_match(buyin, big_blind, small_blind, record_history)
+    finally:
+      if (started):
+        self.telemetry.stop()
     return None
@@ -1,5 +1,23 @@
 from abc import ABC, abstractmethod
 from texasholdem import TexasHoldEm
+from numpy import uint64
+from numpy.random import SeedSequence
+from random import Random
+
+# helper to make a fast python random stream from a numpy SeedSequence. seed
+# sequences can be spawned into independent children, so streams made from
+# different children never overlap.
+def random_from_seed(seed_sequence:SeedSequence):
+  return Random(int(seed_sequence.generate_state(1, dtype = uint64)[0]))
+
+# helper to make `num_streams` python random streams from a numpy SeedSequence
+# with a single draw of its state, cheaper than spawning a child per stream.
+# one more 64 bit seed is returned after the streams, e.g. to seed a numpy
+# generator later only if it's needed
+def randoms_from_seed(seed_sequence:SeedSequence, num_streams:int):
+  words = seed_sequence.generate_state(num_streams + 1, dtype = uint64)
+  return [Random(int(word)) for word in words[:num_streams]] + \
+    [int(words[num_streams])]
 
 ########################## POKER BOT CLASS DEFINITION ##########################
 
@@ -8,7 +26,8 @@ from texasholdem import TexasHoldEm
 # standardized and modular way to implement our other bots.
 class PokerBot(ABC):
   def __init__(self):
-    pass
+    # unseeded until MatchHandler hands out a stream
+    self.set_rng(SeedSequence())
 
   # helper function that should be called by child classes before performing
   # methods that relying upon having a game object loaded. returns nothing,
@@ -41,6 +60,21 @@ class PokerBot(ABC):
     self.player_num = player_num
     return None
   
+  # gives the bot its own random stream derived from `seed_sequence`, so that
+  # its decisions are reproducible and independent of other bots. called by
+  # MatchHandler before every hand. child classes needing more streams can
+  # override this and spawn them from `seed_sequence`.
+  def set_rng(self, seed_sequence:SeedSequence):
+    self.rng = random_from_seed(seed_sequence)
+    return None
+
+  # returns a dict of values worth watching during long training runs, which
+  # Telemetry records alongside the bot's chip EV. called from telemetry's
+  # background thread, so should only read attributes. child classes with
+  # learned state can override this, by default there's nothing to report.
+  def get_telemetry(self):
+    return {}
+
   # shorthand helper function to get the bot's chips for those curious users
   def get_num_chips(self):
     # cover self.game not being set
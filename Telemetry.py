@@ -0,0 +1,205 @@
+from contextlib import contextmanager
+from threading import Event, Thread
+from time import monotonic, time, sleep
+from typing import Optional
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+
+########################## TELEMETRY CLASS DEFINITION ##########################
+
+# class that samples the training progress of one or more MatchHandlers (e.g.
+# the tables batched by JerryPopulationRational.run_hands()) from a background
+# thread, so nothing is added to the hot path besides the handlers' hand
+# counters. every `interval` seconds it records throughput, each bot's chip EV
+# and telemetry (see PokerBot.get_telemetry()) and the process's memory use as
+# one JSON line, appended to a rolling file at `path` and/or sent as a UDP
+# datagram to localhost:`port`. watch it with `python Telemetry.py <path>`.
+# MatchHandler.run_matches() samples by itself, wrap other training loops in
+# `with telemetry.sampling(handlers):`. a failed sample is logged and skipped,
+# it never interrupts training.
+class Telemetry:
+  def __init__(self, path:Optional[str] = "telemetry.jsonl",
+               interval:float = 5.0, max_bytes:int = 10000000,
+               port:Optional[int] = None):
+    # cover having nowhere to send samples
+    if (path is None and port is None):
+      raise ValueError("at least one of arguments path and port required")
+    self.path = path            # rolling file samples are appended to
+    self.interval = interval    # seconds between samples
+    self.max_bytes = max_bytes  # file size at which it's rolled over to .1
+    self.port = port            # localhost UDP port samples are sent to
+    self._thread = None
+    self._stop = Event()
+
+  # start sampling `handlers` (a MatchHandler or a sequence of them) from a
+  # background thread. returns False if already sampling, True otherwise
+  def start(self, handlers):
+    if (self._thread is not None):
+      return False
+    if (not isinstance(handlers, (list, tuple))):
+      handlers = [handlers]
+    self.handlers = list(handlers)
+    self._socket = None
+    if (self.port is not None):
+      self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self._last_time = monotonic()
+    self._last_hands = sum(handler.num_hands_played
+                           for handler in self.handlers)
+    self._stop.clear()
+    self._thread = Thread(target = self._run, name = "telemetry",
+                          daemon = True)
+    self._thread.start()
+    return True
+
+  # stop sampling, after taking one last sample. never raises for a failed
+  # sample, so it's safe to call while handling a training exception
+  def stop(self):
+    if (self._thread is None):
+      return None
+    self._stop.set()
+    self._thread.join()
+    self._thread = None
+    try:
+      self._try_sample()
+    finally:
+      if (self._socket is not None):
+        self._socket.close()
+    return None
+
+  # context manager sampling `handlers` (see start()) for the duration of a
+  # with block, e.g. around a loop of JerryPopulationRational.run_hands()
+  # calls. does nothing if already sampling
+  @contextmanager
+  def sampling(self, handlers):
+    started = self.start(handlers)
+    try:
+      yield self
+    finally:
+      if (started):
+        self.stop()
+
+  # helper run by the background thread, samples every interval until stopped
+  def _run(self):
+    while (not self._stop.wait(self.interval)):
+      self._try_sample()
+    return None
+
+  # helper to take one sample, logging (rather than raising) any failure so
+  # neither the sampling thread nor training is brought down by it
+  def _try_sample(self):
+    try:
+      self._sample()
+    except Exception:
+      logging.getLogger(__name__).exception("telemetry sample failed")
+    return None
+
+  # helper to take one sample of the handlers and write it out
+  def _sample(self):
+    now = monotonic()
+    hands = sum(handler.num_hands_played for handler in self.handlers)
+    elapsed = now - self._last_time
+    record = {"time":time(),
+              "hands":hands,
+              "matches":sum(handler.match_num + 1
+                            for handler in self.handlers),
+              "hands per second":(hands - self._last_hands) / elapsed if \
+                elapsed > 0 else 0.0,
+              "bots":[]}
+    rss, peak = _get_rss()
+    # only the peak is available on some platforms, label it as such
+    record["peak rss bytes" if peak else "rss bytes"] = rss
+    self._last_time = now
+    self._last_hands = hands
+    for handler in self.handlers:
+      handler_hands = handler.num_hands_played
+      for i in range(handler.num_bots):
+        bot = handler.bots[i]
+        bot_record = {"table":handler.table, "bot":i,
+                      "class":type(bot).__name__,
+                      "chip ev":handler.chip_totals[i] / handler_hands if \
+                        handler_hands > 0 else 0.0}
+        bot_record.update(bot.get_telemetry())
+        record["bots"].append(bot_record)
+    line = json.dumps(record)
+    if (self.path is not None):
+      self._write(line)
+    if (self._socket is not None):
+      self._socket.sendto(line.encode(), ("127.0.0.1", self.port))
+    return None
+
+  # helper to append a line to the rolling file, rolling it over to .1 once
+  # it exceeds max_bytes
+  def _write(self, line:str):
+    if (os.path.exists(self.path) and \
+        os.path.getsize(self.path) > self.max_bytes):
+      os.replace(self.path, self.path + ".1")
+    with open(self.path, "a") as file:
+      file.write(line + "\n")
+    return None
+
+# helper to get the process's resident set size in bytes (None if it can't be
+# determined on this platform), and whether it's the peak rather than current
+def _get_rss():
+  try:
+    # linux: current resident pages
+    with open("/proc/self/statm") as file:
+      return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"), False
+  except (OSError, ValueError, AttributeError):
+    pass
+  try:
+    # other unixes: peak resident size (bytes on macos, kilobytes elsewhere)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak if sys.platform == "darwin" else peak * 1024), True
+  except ImportError:
+    return None, False
+
+# helper to print one sample as a single readable line
+def _show(line:str):
+  record = json.loads(line)
+  label = "peak rss" if "peak rss bytes" in record else "rss"
+  rss = record.get("peak rss bytes", record.get("rss bytes"))
+  parts = [f"hands {record['hands']}",
+           f"{record['hands per second']:.1f} hands/s",
+           f"{label} {rss / 2**20:.0f}MiB" if rss is not None else \
+             f"{label} ?"]
+  for bot in record["bots"]:
+    fields = ", ".join(f"{name} {value:.3g}" if isinstance(value, float) \
+                       else f"{name} {value}" for name, value in bot.items()
+                       if name not in ("table", "bot", "class"))
+    parts.append(f"[{bot['table']}.{bot['bot']} {bot['class']}: {fields}]")
+  print(" | ".join(parts), flush = True)
+  return None
+
+# tiny viewer, follows a telemetry file (or listens on a UDP port) and prints
+# each sample as it arrives, e.g. python Telemetry.py telemetry.jsonl
+if (__name__ == "__main__"):
+  parser = argparse.ArgumentParser(description = "watch training telemetry")
+  parser.add_argument("path", nargs = "?", default = "telemetry.jsonl")
+  parser.add_argument("--port", type = int, default = None,
+                      help = "listen on this UDP port instead of a file")
+  args = parser.parse_args()
+  if (args.port is not None):
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", args.port))
+    while (True):
+      _show(receiver.recv(65536).decode())
+  else:
+    position = 0
+    while (True):
+      # restart from the top if the file was rolled over
+      if (os.path.exists(args.path) and \
+          os.path.getsize(args.path) < position):
+        position = 0
+      if (os.path.exists(args.path)):
+        with open(args.path) as file:
+          file.seek(position)
+          for line in file:
+            if (line.endswith("\n")):
+              _show(line)
+              position += len(line.encode())
+      sleep(1.0)
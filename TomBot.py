@@ -1,5 +1,4 @@
 from texasholdem import ActionType
-from random import random, randint
 from PokerBot import PokerBot
 
 ############################# TOM CLASS DEFINITION #############################
@@ -38,7 +37,7 @@ class TomBot(PokerBot):
     #
     ########## MAKE DECISION ##########
     # flip coin to determine decision
-    if (random() > 0.5):
+    if (self.rng.random() > 0.5):
       ##### TRY TO RAISE #####
       min_raise = self.game.get_available_moves().raise_range.start
       max_raise = min(10 + self.game.get_available_moves().raise_range.start,
@@ -54,7 +53,7 @@ class TomBot(PokerBot):
           self.game.take_action(ActionType.CHECK)
           return None
       # if we get here, we can raise normally
-      raise_amount = randint(min_raise, max_raise)
+      raise_amount = self.rng.randint(min_raise, max_raise)
       # ensure raise is valid (should always be true)
       if (self.game.validate_move(action = ActionType.RAISE,
                                   value = raise_amount)):
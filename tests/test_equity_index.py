@@ -0,0 +1,101 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from numpy import empty, full
+from texasholdem import TexasHoldEm, Card, ActionType
+from JerryVersions.JerryBotRational import JerryBotRational
+from JerryVersions.EquityIndex import EquityIndex, board_features, \
+  build_equity_index
+
+# helper to build a small index quickly
+def _small_index():
+  index, _ = build_equity_index(num_samples = 300, num_bootstraps = 20,
+                                num_buckets = 8, min_count = 1,
+                                num_validation = 10,
+                                reference_bootstraps = 50, seed = 3,
+                                verbose = False)
+  return index
+
+# helper to make an index that covers nothing, so every lookup misses
+def _empty_index(num_opponents = tuple(range(1, 10)), error = 0.0):
+  return EquityIndex(empty(0, dtype = "int64"), empty(0, dtype = "uint8"),
+                     empty(0, dtype = "uint16"), empty(0, dtype = "int64"),
+                     empty(0, dtype = "uint8"), full((2, 1), 0.5),
+                     num_opponents = num_opponents, error = error)
+
+# helper to get a heads up game dealt to the flop
+def _game_at_flop():
+  game = TexasHoldEm(buyin = 200, big_blind = 10, small_blind = 5,
+                     max_players = 2)
+  game.start_hand()
+  while (len(game.board) < 3):
+    if (game.validate_move(action = ActionType.CHECK)):
+      game.take_action(ActionType.CHECK)
+    else:
+      game.take_action(ActionType.CALL)
+  return game
+
+# an index loaded from disk answers exactly like the one saved
+def test_save_load_round_trip(tmp_path):
+  index = _small_index()
+  path = str(tmp_path / "index.npz")
+  index.save(path)
+  loaded = EquityIndex.load(path)
+  assert (loaded.fine_keys == index.fine_keys).all()
+  assert (loaded.coarse_buckets == index.coarse_buckets).all()
+  assert loaded.num_opponents == index.num_opponents
+  assert loaded.error == index.error
+  hole = [Card("As"), Card("Kd")]
+  for board in ([Card("Qs"), Card("7h"), Card("2c")],
+                [Card("Qs"), Card("7h"), Card("2c"), Card("Ts")]):
+    for num_ops in (1, 3):
+      assert loaded.lookup(hole, board, num_ops) == \
+        index.lookup(hole, board, num_ops)
+
+# relabelling suits doesn't change the key or the answer
+def test_suit_permuted_situations_share_key():
+  index = _small_index()
+  hole = [Card("Ah"), Card("Th")]
+  board = [Card("9h"), Card("8s"), Card("2h"), Card("Jd")]
+  # spades -> clubs -> diamonds -> hearts -> spades
+  swap = {"s":"c", "c":"d", "d":"h", "h":"s"}
+  permute = lambda cards: [Card(str(card)[0] + swap[str(card)[1]])
+                           for card in cards]
+  for street in (3, 4):
+    assert board_features(hole, board[:street], 1) == \
+      board_features(permute(hole), permute(board[:street]), 1)
+    assert index.lookup(hole, board[:street], 1) == \
+      index.lookup(permute(hole), permute(board[:street]), 1)
+
+# only the flop and turn are indexed
+def test_preflop_and_river_not_indexed():
+  index = _small_index()
+  hole = [Card("As"), Card("Kd")]
+  board = [Card("Qs"), Card("7h"), Card("2c"), Card("Ts"), Card("3d")]
+  assert index.lookup(hole, [], 1) is None
+  assert index.lookup(hole, board, 1) is None
+
+# without fallback, a missed lookup gives neutral strength
+def test_no_fallback_gives_neutral_strength():
+  jerry = JerryBotRational(equity_index = _empty_index(),
+                           index_fallback = False)
+  game = _game_at_flop()
+  jerry.set_game(game, game.current_player)
+  assert jerry._get_win_prob(2) == 1/2
+
+# an index that misses the table's opponent counts is rejected up front
+def test_uncovered_table_size_rejected():
+  jerry = JerryBotRational(equity_index = _empty_index(num_opponents = (1,)))
+  game = TexasHoldEm(buyin = 200, big_blind = 10, small_blind = 5,
+                     max_players = 3)
+  with pytest.raises(ValueError):
+    jerry.set_game(game, 0)
+
+# an index whose build report error is too large is rejected
+def test_inaccurate_index_rejected():
+  with pytest.raises(ValueError):
+    JerryBotRational(equity_index = _empty_index(error = 0.16))
+  with pytest.raises(ValueError):
+    JerryBotRational(equity_index = _empty_index(error = float("nan")))
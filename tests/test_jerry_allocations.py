@@ -0,0 +1,59 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tracemalloc
+import numpy
+from MatchHandler import MatchHandler
+from TomBot import TomBot
+from JerryVersions.JerryBotRational import JerryBotRational
+
+# once mature, Jerry's decisions allocate no NumPy arrays, not even temporary
+# ones, and keep reusing the same short-term buffers
+def test_make_decision_allocates_no_numpy_arrays():
+  jerry = JerryBotRational(maturity = 10, num_bootstraps = 20)
+  handler = MatchHandler([jerry, TomBot()], seed = 0)
+  # warm Jerry past maturity (and past the first short-term buffer growth)
+  handler.start_game(500, 5, 2)
+  while (jerry.age < 30):
+    if (not handler.game.is_game_running()):
+      handler.start_game(500, 5, 2)
+    handler.run_hand()
+  c_m_rec = jerry.c_m_rec
+  r_m_rec = jerry.r_m_rec
+  # enough bootstraps that an array of them would stand out in the peak
+  num_bootstraps = 2000
+  jerry.set_parameters(num_bootstraps = num_bootstraps)
+  # wrap make_decision with a NumPy-domain snapshot diff, which sees arrays
+  # that survive the call, and the traced peak, which sees temporary ones.
+  # the peak also counts python objects (a few KB), so it's only compared
+  # against the size of one float per bootstrap
+  numpy_domain = [tracemalloc.DomainFilter(True, numpy.lib.tracemalloc_domain)]
+  make_decision = jerry.make_decision
+  allocations = []
+  peaks = []
+  def traced_make_decision():
+    tracemalloc.start()
+    try:
+      before = tracemalloc.take_snapshot().filter_traces(numpy_domain)
+      tracemalloc.reset_peak()
+      start, _ = tracemalloc.get_traced_memory()
+      make_decision()
+      _, peak = tracemalloc.get_traced_memory()
+      after = tracemalloc.take_snapshot().filter_traces(numpy_domain)
+    finally:
+      tracemalloc.stop()
+    allocations.append(sum(stat.count_diff
+                           for stat in after.compare_to(before, "lineno")
+                           if stat.count_diff > 0))
+    peaks.append(peak - start)
+  jerry.make_decision = traced_make_decision
+  while (jerry.age < 34):
+    if (not handler.game.is_game_running()):
+      handler.start_game(500, 5, 2)
+    handler.run_hand()
+  assert len(allocations) > 0
+  assert sum(allocations) == 0
+  assert max(peaks) < 8 * num_bootstraps
+  assert jerry.c_m_rec is c_m_rec
+  assert jerry.r_m_rec is r_m_rec
@@ -0,0 +1,42 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from random import Random
+from numpy import asarray, argsort, diff, array_equal
+from texasholdem.evaluator import evaluate
+from JerryVersions.JerryHelpers import int_to_card, hand_scores, \
+  batch_win_probs, simulate_win_prob
+
+# batched scores order (and tie) hands exactly like the evaluator
+def test_hand_scores_match_evaluator():
+  rng = Random(7)
+  hands = asarray([rng.sample(range(52), 7) for _ in range(5000)])
+  scores = hand_scores(hands)
+  ranks = asarray([evaluate([int_to_card(c) for c in hand[:2]],
+                            [int_to_card(c) for c in hand[2:]])
+                   for hand in hands])
+  order = argsort(ranks, kind = "stable")
+  assert (diff(scores[order]) <= 0).all()
+  assert array_equal(diff(ranks[order]) == 0, diff(scores[order]) == 0)
+
+# batched estimates agree with simulate_win_prob, and each only depends on its
+# own stream, not on what else is in the batch
+def test_batch_win_probs():
+  hole = [int_to_card(12), int_to_card(25)]
+  boards = [[], [int_to_card(c) for c in (11, 24, 3)],
+            [int_to_card(c) for c in (11, 24, 3, 40)],
+            [int_to_card(c) for c in (11, 24, 3, 40, 7)]]
+  batched = batch_win_probs([hole] * 4, boards, [20000, 20000, 20000, 20000],
+                            [Random(i) for i in range(4)])
+  for k, board in enumerate(boards):
+    assert abs(batched[k] - simulate_win_prob(hole, board, 1, 20000,
+                                              Random(10 + k))) < 0.02
+    alone = batch_win_probs([hole], [board], [20000], [Random(k)])
+    assert alone[0] == batched[k]
+  # situations with fewer bootstraps only count their own
+  mixed = batch_win_probs([hole] * 2, boards[:2], [20000, 50],
+                          [Random(0), Random(1)])
+  assert mixed[0] == batched[0]
+  assert mixed[1] == batch_win_probs([hole], boards[1:2], [50],
+                                     [Random(1)])[0]
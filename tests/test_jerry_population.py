@@ -0,0 +1,87 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from numpy import array
+from MatchHandler import MatchHandler
+from TomBot import TomBot
+from JerryVersions.JerryBotRational import JerryBotRational
+from JerryVersions.JerryPopulationRational import JerryPopulationRational
+
+# helper to play `num_hands` batched hands of 2 seats + 1 TomBot per table
+def _run_batched(population:JerryPopulationRational, num_tables:int,
+                 buyin:int, num_hands:int):
+  handlers = [MatchHandler([population.get_seat(2 * i),
+                            population.get_seat(2 * i + 1), TomBot()],
+                           seed = 1, table = i) for i in range(num_tables)]
+  for handler in handlers:
+    handler.start_game(buyin, 10, 5)
+  for _ in range(num_hands):
+    # restart finished matches so every step plays all tables
+    for handler in handlers:
+      if (not handler.game.is_game_running()):
+        handler.start_game(buyin, 10, 5)
+    population.run_hands(handlers)
+  return handlers
+
+# short stacks: blinds put everyone all in, so some hands end at start
+def test_run_hands_short_stacks():
+  population = JerryPopulationRational(4, maturity = 5, max_memory = 30,
+                                       num_bootstraps = 10)
+  handlers = _run_batched(population, 2, 12, 30)
+  assert sum(handler.num_hands_played for handler in handlers) > 0
+
+# batched bounds match JerryBotRational's on the same memories
+def test_bounds_match_jerry_bot_rational():
+  population = JerryPopulationRational(4, maturity = 5, max_memory = 40,
+                                       num_bootstraps = 10)
+  _run_batched(population, 2, 200, 40)
+  for agent in range(4):
+    memories = population.get_agent_parameters(agent, [
+      "call/check metric mem", "call/check outcome mem", "raise metric mem",
+      "raise outcome mem"])
+    if (min(memory.shape[0] for memory in memories) == 0):
+      continue
+    jerry = JerryBotRational()
+    jerry.set_parameters(c_m_mem = memories[0], c_o_mem = memories[1],
+                         r_m_mem = memories[2], r_o_mem = memories[3])
+    jerry._update_bounds()
+    population._update_bounds(array([agent]))
+    assert jerry.b1 == population.b1[agent]
+    assert jerry.b2 == population.b2[agent]
+
+# an agent can't be batched at two tables at once
+def test_duplicate_agents_rejected():
+  population = JerryPopulationRational(2, num_bootstraps = 10)
+  seat = population.get_seat(0)
+  handlers = [MatchHandler([seat, TomBot()], seed = 1, table = i)
+              for i in range(2)]
+  for handler in handlers:
+    handler.start_game(200, 10, 5)
+  with pytest.raises(ValueError):
+    population.run_hands(handlers)
+
+# seeded handlers make batched training exactly reproducible, memory trimming
+# included
+def test_seeded_batched_runs_reproducible():
+  results = []
+  for _ in range(2):
+    population = JerryPopulationRational(4, maturity = 5, max_memory = 10,
+                                         num_bootstraps = 10)
+    _run_batched(population, 2, 200, 30)
+    results.append((population.b1.tolist(), population.b2.tolist(),
+                    population.c_m_mem[:, :10].tolist()))
+  assert results[0] == results[1]
+
+# memory capacity grows with use rather than being preallocated for
+# max_memory, and stops growing once rows are trimmed
+def test_memory_capacity_grows_on_demand():
+  population = JerryPopulationRational(4, maturity = 5, max_memory = 10000,
+                                       num_bootstraps = 10)
+  assert population.c_m_mem.shape[1] < 100
+  for agent in range(4):
+    population.set_agent_parameters(agent, max_memory = 20)
+  _run_batched(population, 2, 200, 60)
+  assert population.c_n_mem.max() == 20
+  assert population.c_m_mem.shape[1] <= 20 + population.c_m_rec.shape[1]
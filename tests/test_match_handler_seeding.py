@@ -0,0 +1,71 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import random
+from threading import Thread
+from MatchHandler import MatchHandler
+from TomBot import TomBot
+from JerryVersions.JerryBotRational import JerryBotRational
+
+# helper to run seeded matches after scrambling the global random state, and
+# return everything that should be reproducible
+def _run_seeded(bots, seed:int, global_seed:int, buyin:int, big_blind:int,
+                small_blind:int, num_matches:int):
+  random.seed(global_seed)
+  handler = MatchHandler(bots, seed = seed)
+  handler.run_matches(num_matches, buyin, big_blind, small_blind)
+  return handler.num_hands_played, handler.chip_totals
+
+# same seed, different global random states, identical matches
+def test_seeded_matches_ignore_global_random():
+  results = [_run_seeded([JerryBotRational(maturity = 30, num_bootstraps = 30),
+                          TomBot(), TomBot()], 4, global_seed, 200, 10, 5, 40)
+             for global_seed in (1, 2)]
+  assert results[0] == results[1]
+
+# blinds put everyone all in, so whole hands play out inside start_hand()
+def test_seeded_all_in_hands_ignore_global_random():
+  results = [_run_seeded([TomBot(), TomBot()], 9, global_seed, 12, 10, 5, 30)
+             for global_seed in (1, 2)]
+  assert results[0] == results[1]
+
+# every hand is dealt from a single seeded deck, so no card appears twice
+def test_seeded_hands_never_duplicate_cards():
+  handler = MatchHandler([TomBot(), TomBot()], seed = 9)
+  for _ in range(20):
+    handler.start_game(12, 10, 5)
+    while (handler.game.is_game_running()):
+      handler.run_hand()
+      cards = list(handler.game.board)
+      for hand in handler.game.hands.values():
+        cards += hand
+      assert len(cards) == len(set(cards))
+
+# helper to play seeded matches at one table, returning its results
+def _run_table(table:int, results:dict):
+  handler = MatchHandler([TomBot(), TomBot(), TomBot()], seed = 7,
+                         table = table)
+  handler.run_matches(10, 100, 10, 5)
+  results[table] = (handler.num_hands_played, handler.chip_totals)
+
+# tables run in parallel threads match the same tables run one at a time
+def test_seeded_threaded_tables_match_sequential():
+  sequential = {}
+  for table in range(4):
+    _run_table(table, sequential)
+  # switch threads often so hands at different tables interleave
+  switch_interval = sys.getswitchinterval()
+  sys.setswitchinterval(1e-6)
+  try:
+    for _ in range(5):
+      threaded = {}
+      threads = [Thread(target = _run_table, args = (table, threaded))
+                 for table in range(4)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+      assert threaded == sequential
+  finally:
+    sys.setswitchinterval(switch_interval)
@@ -0,0 +1,93 @@
+import sys
+import os
+# look one directory up
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import logging
+from time import sleep
+from MatchHandler import MatchHandler
+from Telemetry import Telemetry
+from TomBot import TomBot
+from JerryVersions.JerryPopulationRational import JerryPopulationRational
+
+# helper to read the samples written to `path`
+def _read(path):
+  with open(path) as file:
+    return [json.loads(line) for line in file]
+
+# a TomBot whose telemetry always fails
+class _BrokenBot(TomBot):
+  def get_telemetry(self):
+    raise RuntimeError("broken telemetry")
+
+# samples land in the file, one JSON line each, with every bot recorded
+def test_samples_written_to_file(tmp_path):
+  path = str(tmp_path / "telemetry.jsonl")
+  telemetry = Telemetry(path, interval = 0.01)
+  handler = MatchHandler([TomBot(), TomBot()], seed = 1)
+  with telemetry.sampling(handler):
+    handler.run_matches(2, 100, 10, 5)
+    sleep(0.05)
+  records = _read(path)
+  assert len(records) >= 2
+  assert all(len(record["bots"]) == 2 for record in records)
+  assert records[-1]["hands"] == handler.num_hands_played
+
+# the file is rolled over to .1 once it exceeds max_bytes
+def test_rollover(tmp_path):
+  path = str(tmp_path / "telemetry.jsonl")
+  telemetry = Telemetry(path, interval = 1000, max_bytes = 1)
+  handler = MatchHandler([TomBot(), TomBot()], seed = 1, telemetry = telemetry)
+  handler.run_matches(1, 100, 10, 5)
+  assert not os.path.exists(path + ".1")
+  handler.run_matches(1, 100, 10, 5)
+  assert os.path.exists(path + ".1")
+  assert len(_read(path)) == 1
+  assert len(_read(path + ".1")) == 1
+  assert _read(path)[0]["hands"] > _read(path + ".1")[0]["hands"]
+
+# stopping takes one last sample, even if the interval never elapsed
+def test_final_sample_on_stop(tmp_path):
+  path = str(tmp_path / "telemetry.jsonl")
+  telemetry = Telemetry(path, interval = 1000)
+  handler = MatchHandler([TomBot(), TomBot()], seed = 1, telemetry = telemetry)
+  handler.run_matches(3, 100, 10, 5)
+  records = _read(path)
+  assert len(records) == 1
+  assert records[0]["hands"] == handler.num_hands_played
+  assert records[0]["matches"] == 3
+
+# failed samples are logged, and neither kill the sampling thread nor
+# escape stop()
+def test_sampling_errors_logged(tmp_path, caplog):
+  path = str(tmp_path / "telemetry.jsonl")
+  telemetry = Telemetry(path, interval = 0.01)
+  handler = MatchHandler([_BrokenBot(), TomBot()], seed = 1)
+  with caplog.at_level(logging.ERROR):
+    telemetry.start(handler)
+    sleep(0.05)
+    assert telemetry._thread.is_alive()
+    telemetry.stop()
+  assert "telemetry sample failed" in caplog.text
+  assert not os.path.exists(path)
+
+# batched population training can be sampled across all of its tables
+def test_sampling_population_tables(tmp_path):
+  path = str(tmp_path / "telemetry.jsonl")
+  telemetry = Telemetry(path, interval = 1000)
+  population = JerryPopulationRational(4, num_bootstraps = 10)
+  handlers = [MatchHandler([population.get_seat(2 * i),
+                            population.get_seat(2 * i + 1)],
+                           seed = 1, table = i) for i in range(2)]
+  for handler in handlers:
+    handler.start_game(200, 10, 5)
+  with telemetry.sampling(handlers):
+    for _ in range(5):
+      population.run_hands([handler for handler in handlers
+                            if handler.game.is_game_running()])
+  record = _read(path)[-1]
+  assert record["hands"] == sum(handler.num_hands_played
+                                for handler in handlers)
+  assert [(bot["table"], bot["bot"]) for bot in record["bots"]] == \
+    [(0, 0), (0, 1), (1, 0), (1, 1)]
+  assert all("b1" in bot for bot in record["bots"])